@@ -3,6 +3,7 @@ RAGAS Data Collection Script
 Runs test questions through your RAG system and collects evaluation data.
 """
 
+import asyncio
 import json
 from pathlib import Path
 import sys
@@ -11,12 +12,16 @@ import sys
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.rag.retrieval.index import retrieve_context
+from src.rag.retrieval.index import retrieve_context, embed_queries, seed_embedding_cache
 from src.rag.retrieval.utils import prepare_prompt_and_invoke_llm
 
 # Configuration
 PROJECT_ID = "5fafc7b2-d6e8-4ef6-90f7-1fe83250a913"
 
+# Question embeddings persisted between runs - the question list is static,
+# so after the first run no embedding API calls are needed at all.
+EMBED_CACHE_PATH = Path(__file__).parent.parent / "datasets" / "question_embeddings.json"
+
 TEST_QUESTIONS = [
     "Explain the difference between macronutrients and micronutrients, giving two examples of each.",
     "How does the glycemic index of a food affect blood glucose levels, and why are low-GI foods generally recommended for long-term health?",
@@ -51,36 +56,85 @@ TEST_QUESTIONS = [
 ]
 
 
-def collect_rag_data(project_id: str, questions: list) -> list:
-    """Run questions through RAG pipeline and collect data."""
-    dataset = []
+# Separate caps for the two pipeline stages: retrieval is cheap Supabase I/O
+# and can run ahead, while generation is the expensive OpenAI resource. With
+# independent semaphores, retrieval for later questions overlaps generation
+# for earlier ones instead of queueing behind it.
+MAX_CONCURRENT_RETRIEVALS = 8
+MAX_CONCURRENT_GENERATIONS = 4
+
+
+def prewarm_question_embeddings(questions: list) -> None:
+    """Load persisted question embeddings, embed any new questions, and save back.
+
+    Seeding the retrieval embedding cache means retrieve_context never has to
+    call the OpenAI embeddings API for these questions.
+    """
+    persisted = {}
+    if EMBED_CACHE_PATH.exists():
+        with open(EMBED_CACHE_PATH, "r", encoding="utf-8") as f:
+            persisted = json.load(f)
+
+    known = {q: persisted[q] for q in questions if q in persisted}
+    seed_embedding_cache(known)
+
+    # embed_queries batches all cache misses into a single OpenAI call
+    embeddings = embed_queries(questions)
 
-    for question in questions:
-        print(f"Processing: {question}")
+    if len(known) < len(questions):
+        persisted.update(dict(zip(questions, embeddings)))
+        EMBED_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(EMBED_CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump(persisted, f)
+        print(f"Persisted {len(questions) - len(known)} new question embeddings")
 
-        # Retrieve context
-        texts, images, tables, citations = retrieve_context(project_id, question)
+
+async def collect_rag_data(project_id: str, questions: list) -> list:
+    """Run questions through RAG pipeline concurrently and collect data.
+
+    Both retrieval (Supabase RPC) and generation (OpenAI) are I/O-bound,
+    so we dispatch all questions at once and let a semaphore cap how many
+    are in flight at the same time.
+    """
+    retrieval_semaphore = asyncio.Semaphore(MAX_CONCURRENT_RETRIEVALS)
+    generation_semaphore = asyncio.Semaphore(MAX_CONCURRENT_GENERATIONS)
+
+    async def process_question(question: str) -> dict:
+        async with retrieval_semaphore:
+            print(f"Processing: {question}")
+
+            # Retrieve context (blocking helpers run in worker threads)
+            texts, images, tables, citations = await asyncio.to_thread(
+                retrieve_context, project_id, question
+            )
 
         # Prepare contexts for RAGAS
         contexts = texts + [f"[TABLE]\n{table}" for table in tables]
 
-        # Generate answer
-        answer = prepare_prompt_and_invoke_llm(question, texts, [], tables)
+        # Generate answer - gated separately so retrieval of the next
+        # questions keeps running while generation slots are busy
+        async with generation_semaphore:
+            answer = await asyncio.to_thread(
+                prepare_prompt_and_invoke_llm, question, texts, [], tables
+            )
 
-        dataset.append(
-            {
-                "question": question,
-                "contexts": contexts or ["No context found"],
-                "answer": answer,
-            }
-        )
+        return {
+            "question": question,
+            "contexts": contexts or ["No context found"],
+            "answer": answer,
+        }
 
-    return dataset
+    # gather preserves the order of `questions` in the returned dataset
+    dataset = await asyncio.gather(*[process_question(q) for q in questions])
+    return list(dataset)
 
 
 if __name__ == "__main__":
+    # Reuse embeddings from previous runs for the static question list
+    prewarm_question_embeddings(TEST_QUESTIONS)
+
     # Collect and save data
-    dataset = collect_rag_data(PROJECT_ID, TEST_QUESTIONS)
+    dataset = asyncio.run(collect_rag_data(PROJECT_ID, TEST_QUESTIONS))
 
     output_path = (
         Path(__file__).parent.parent / "datasets" / "ragas_evaluation_dataset.json"
@@ -1,5 +1,6 @@
+import logging
+import os
 import time
-import uuid
 from typing import Callable
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -14,34 +15,44 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         super().__init__(app)
 
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        request_id = str(uuid.uuid4())
+        # 16 random bytes as a 32-char hex id - same uniqueness as uuid4
+        # without the UUID object allocation and hyphen formatting
+        request_id = os.urandom(16).hex()
         set_request_id(request_id)
-        start_time = time.time()
-        logger.info(
-            "request_started",
-            method=request.method,
-            path=request.url.path,
-            client_host=request.client.host if request.client else None,
-        )
-        try:
-            response = await call_next(request)  # Process the request
-            duration = time.time() - start_time
+        # Cache once per request; avoids re-parsing the URL on every log call
+        method = request.method
+        path = request.url.path
+        # Only build the structured payloads when info logs are actually emitted
+        info_enabled = logger.isEnabledFor(logging.INFO)
+        # perf_counter is monotonic - immune to NTP adjustments, finer resolution
+        start_time = time.perf_counter()
+        if info_enabled:
             logger.info(
-                "request_completed",
-                method=request.method,
-                path=request.url.path,
-                status_code=response.status_code,
-                duration_seconds=round(duration, 4),
+                "request_started",
+                method=method,
+                path=path,
+                client_host=request.client.host if request.client else None,
             )
+        try:
+            response = await call_next(request)  # Process the request
+            duration = time.perf_counter() - start_time
+            if info_enabled:
+                logger.info(
+                    "request_completed",
+                    method=method,
+                    path=path,
+                    status_code=response.status_code,
+                    duration_seconds=round(duration, 4),
+                )
             response.headers["X-Request-ID"] = request_id
             return response
 
         except Exception as e:
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             logger.error(
                 "request_failed",
-                method=request.method,
-                path=request.url.path,
+                method=method,
+                path=path,
                 duration_seconds=round(duration, 4),
                 error=str(e),
                 exc_info=True,
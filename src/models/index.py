@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
 from typing import Optional, List
 from enum import Enum
 
@@ -16,7 +16,8 @@ class ChatCreate(BaseModel):
 
 
 class ProjectSettings(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
+    # extra="forbid" keeps unknown keys out of the settings UPDATE payload
+    model_config = ConfigDict(from_attributes=True, extra="forbid")
     embedding_model: str = Field(..., description="The embedding model to use")
     rag_strategy: str = Field(..., description="The RAG strategy to use")
     agent_type: str = Field(..., description="The agent type to use")
@@ -41,6 +42,14 @@ class UrlRequest(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     url: str = Field(..., description="The url to process")
 
+    @field_validator("url")
+    @classmethod
+    def normalize_scheme(cls, value: str) -> str:
+        # Default bare domains to https so handlers always see a full URL
+        if not value.startswith(("http://", "https://")):
+            return f"https://{value}"
+        return value
+
 
 class ProcessingStatus(str, Enum):
     UPLOADING = "uploading"
@@ -1,11 +1,11 @@
 from src.services.supabase import supabase
-import os
 import time
 from src.services.llm import openAI
 from src.services.awsS3 import s3_client
 from src.config.index import appConfig
 from src.rag.ingestion.utils import (
-    partition_document,
+    partition_document_bytes,
+    partition_document_in_subprocess,
     analyze_elements,
     separate_content_types,
     get_page_number,
@@ -113,41 +113,17 @@ def update_status_in_database(
     Update the project document record with the new status and details.
     """
     try:
-        # Get the project document record
-        document_result = (
-            supabase.table("project_documents")
-            .select("processing_details")
-            .eq("id", document_id)
-            .execute()
-        )
-        if not document_result.data:
-            raise Exception(
-                f"Failed to get project document record with id: {document_id}"
-            )
-
-        # Add processing details to the project document record if there are any
-        current_details = {}
-        if document_result.data[0]["processing_details"]:
-            current_details = document_result.data[0]["processing_details"]
-
-        # Add new details if provided
-        if details:
-            current_details.update(
-                details
-            )  # Note : update() - built-in dict method that merges another dictionary into the current one.
-
-        # Update the project document record with the new details
-        document_update_result = (
-            supabase.table("project_documents")
-            .update(
-                {
-                    "processing_status": status.value,
-                    "processing_details": current_details,
-                }
-            )
-            .eq("id", document_id)
-            .execute()
-        )
+        # Single RPC: sets the status and merges `details` into the existing
+        # processing_details JSON atomically in Postgres. One round-trip
+        # instead of select-then-update, and no read-modify-write race.
+        document_update_result = supabase.rpc(
+            "update_document_status",
+            {
+                "doc_id": document_id,
+                "new_status": status.value,
+                "new_details": details or {},
+            },
+        ).execute()
 
         if not document_update_result.data:
             raise Exception(
@@ -174,38 +150,36 @@ def download_content_and_partition(document_id: str, document: dict):
             source_type=document_source_type,
         )
         elements = None
-        temp_file_path = None
         if document_source_type == "file":
-            # Download the file from S3
+            # Stream the file from S3 straight into memory - no /tmp
+            # write+read cycle for the partitioner to re-consume.
             s3_key = document["s3_key"]
             filename = document["filename"]
             file_type = filename.split(".")[-1].lower()
 
-            # Download the file to a temporary directory - for all OS - Linux , Windows , Mac
-            temp_file_path = f"/tmp/{document_id}.{file_type}"
-            s3_client.download_file(appConfig["s3_bucket_name"], s3_key, temp_file_path)
+            s3_object = s3_client.get_object(
+                Bucket=appConfig["s3_bucket_name"], Key=s3_key
+            )
+            file_bytes = s3_object["Body"].read()
 
-            elements = partition_document(temp_file_path, file_type)
+            # hi_res partitioning is CPU-bound - run it in a subprocess so the
+            # threaded Celery worker isn't pinned by the GIL.
+            elements = partition_document_in_subprocess(file_bytes, file_type)
 
         if document_source_type == "url":
 
             url = document["source_url"]
-            # Crawl the URL
+            # Crawl the URL and partition the response body directly
             response = scrapingbee_client.get(url)
-            temp_file_path = f"/tmp/{document_id}.html"
-            with open(temp_file_path, "wb") as f:
-                f.write(response.content)
-
-            elements = partition_document(temp_file_path, "html", source_type="url")
+            elements = partition_document_bytes(
+                response.content, "html", source_type="url"
+            )
 
         elements_summary = analyze_elements(elements)
         logger.info(
             "elements_analyzed", document_id=document_id, summary=elements_summary
         )
 
-        # Delete the temprary file
-        os.remove(temp_file_path)
-
         return elements_summary, elements
 
     except Exception as e:
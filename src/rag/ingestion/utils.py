@@ -1,3 +1,9 @@
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
 from unstructured.partition.html import partition_html
 from unstructured.partition.pdf import partition_pdf
 from unstructured.partition.docx import partition_docx
@@ -12,6 +18,86 @@ from src.config.logging import get_logger
 logger = get_logger(__name__)
 
 
+# Precompiled file_type -> partitioner mapping, built once at import instead
+# of rebuilding a dict of closures on every call. Each entry only needs the
+# filename at call time.
+_PARTITION_DISPATCH = {
+    "pdf": partial(
+        partition_pdf,
+        strategy="hi_res",  # Most accurate (but slower) processing method of extraction.
+        infer_table_structure=True,  # Keep tables as structured HTML, not jumbled text.
+        extract_image_block_types=["Image"],  # Grab images found in pdf.
+        extract_image_block_to_payload=True,  # Store images as base64 strings in the payload.
+    ),
+    "docx": partial(
+        partition_docx,
+        strategy="hi_res",
+        infer_table_structure=True,
+        # ! Note : We haven't implemented image extraction for docx,pptx ,md files.
+    ),
+    "pptx": partial(
+        partition_pptx,
+        strategy="hi_res",
+        infer_table_structure=True,
+    ),
+    "txt": partition_text,
+    "md": partition_md,
+}
+
+
+# hi_res partitioning (layout model + OCR) is CPU-bound and holds the GIL.
+# The Celery worker runs with --pool=threads, so partitioning in-process would
+# stall every other task in the worker. A small process pool keeps the worker
+# responsive and lets concurrent documents partition on separate cores.
+_partition_pool = None
+_partition_pool_lock = threading.Lock()
+
+
+def _get_partition_pool() -> ProcessPoolExecutor:
+    global _partition_pool
+    with _partition_pool_lock:
+        if _partition_pool is None:
+            _partition_pool = ProcessPoolExecutor(
+                max_workers=max(1, (os.cpu_count() or 2) - 1)
+            )
+        return _partition_pool
+
+
+def partition_document_in_subprocess(
+    file_bytes: bytes, file_type: str, source_type: str = "file"
+):
+    """Run partition_document_bytes in a worker process (for CPU-bound file types).
+
+    Takes raw bytes rather than a path so no intermediate temp file is needed
+    and the payload pickles cleanly across the process boundary.
+    """
+    future = _get_partition_pool().submit(
+        partition_document_bytes, file_bytes, file_type, source_type
+    )
+    return future.result()
+
+
+def partition_document_bytes(
+    file_bytes: bytes, file_type: str, source_type: str = "file"
+):
+    """Partition a document held in memory (S3 body / crawled HTML) without
+    writing it to disk first - the partitioners all accept file-like objects."""
+
+    buffer = io.BytesIO(file_bytes)
+
+    source = (source_type or "file").lower()
+    if source == "url":
+        return partition_html(file=buffer)
+
+    kind = (file_type or "").lower()
+    partitioner = _PARTITION_DISPATCH.get(kind)
+    if partitioner is None:
+        logger.error("partition_document_unsupported_type", file_type=kind)
+        raise ValueError(f"Unsupported file_type: {file_type}")
+
+    return partitioner(file=buffer)
+
+
 def partition_document(temp_file: str, file_type: str, source_type: str = "file"):
     """Partition document based on file type and source type"""
 
@@ -22,34 +108,12 @@ def partition_document(temp_file: str, file_type: str, source_type: str = "file"
         )
 
     kind = (file_type or "").lower()
-    dispatch = {
-        "pdf": lambda: partition_pdf(
-            filename=temp_file,
-            strategy="hi_res",  # Most accurate (but slower) processing method of extraction.
-            infer_table_structure=True,  # Keep tables as structured HTML, not jumbled text.
-            extract_image_block_types=["Image"],  # Grab images found in pdf.
-            extract_image_block_to_payload=True,  # Store images as base64 strings in the payload.
-        ),
-        "docx": lambda: partition_docx(
-            filename=temp_file,
-            strategy="hi_res",
-            infer_table_structure=True,
-            # ! Note : We haven't implemented image extraction for docx,pptx ,md files.
-        ),
-        "pptx": lambda: partition_pptx(
-            filename=temp_file,
-            strategy="hi_res",
-            infer_table_structure=True,
-        ),
-        "txt": lambda: partition_text(filename=temp_file),
-        "md": lambda: partition_md(filename=temp_file),
-    }
-
-    if kind not in dispatch:
+    partitioner = _PARTITION_DISPATCH.get(kind)
+    if partitioner is None:
         logger.error("partition_document_unsupported_type", file_type=kind)
         raise ValueError(f"Unsupported file_type: {file_type}")
 
-    return dispatch[kind]()
+    return partitioner(filename=temp_file)
 
 
 def analyze_elements(elements):
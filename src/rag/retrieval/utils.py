@@ -1,13 +1,119 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
 from src.services.supabase import supabase
+from src.services.redis import redis_client
 from fastapi import HTTPException
 from typing import List, Dict, Tuple
 from langchain_core.messages import SystemMessage, HumanMessage
 from src.services.llm import openAI
 from src.models.index import QueryVariations
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# Short-lived TTL cache for per-project lookups. Settings and document ids
+# don't change within a request, but retrieval re-reads them for every user
+# query (and N times across an eval run) - cache hits turn those Supabase
+# round-trips into dict lookups. Mutating routes call invalidate_project_cache.
+PROJECT_CACHE_TTL_SECONDS = 60
+_project_settings_cache = {}
+_project_document_ids_cache = {}
+# Callers run in asyncio.to_thread workers, so the dicts above (and the
+# OrderedDict below) see concurrent mutation - guard them like the
+# embedding cache in index.py.
+_project_cache_lock = threading.Lock()
+
+
+def _cache_get(cache: dict, project_id: str):
+    with _project_cache_lock:
+        entry = cache.get(project_id)
+    if entry and (time.monotonic() - entry[1]) < PROJECT_CACHE_TTL_SECONDS:
+        return entry[0]
+    return None
+
+
+# Cache of full retrieval results keyed by (project_id, normalized query).
+# A hit skips the entire pipeline - settings/doc-id lookups, embedding,
+# search RPCs and fusion - for repeated questions within the TTL.
+RETRIEVAL_CONTEXT_CACHE_TTL_SECONDS = 300
+RETRIEVAL_CONTEXT_CACHE_MAX_SIZE = 128
+_retrieval_context_cache = OrderedDict()
+_retrieval_context_cache_lock = threading.Lock()
+
+
+def get_cached_retrieval_context(project_id: str, query_key: str):
+    with _retrieval_context_cache_lock:
+        entry = _retrieval_context_cache.get((project_id, query_key))
+        if (
+            entry
+            and (time.monotonic() - entry[1]) < RETRIEVAL_CONTEXT_CACHE_TTL_SECONDS
+        ):
+            _retrieval_context_cache.move_to_end((project_id, query_key))
+            return entry[0]
+    return None
+
+
+def store_retrieval_context(project_id: str, query_key: str, context) -> None:
+    with _retrieval_context_cache_lock:
+        _retrieval_context_cache[(project_id, query_key)] = (context, time.monotonic())
+        _retrieval_context_cache.move_to_end((project_id, query_key))
+        while len(_retrieval_context_cache) > RETRIEVAL_CONTEXT_CACHE_MAX_SIZE:
+            _retrieval_context_cache.popitem(last=False)
+
+
+# Second-level settings cache in Redis: settings rarely change but are
+# read on every chat/RAG request, and the in-process cache is cold after
+# a restart and per-worker. The Redis TTL is longer because explicit
+# invalidation (below) handles updates; the 60s in-process layer only
+# bounds staleness across instances.
+PROJECT_SETTINGS_REDIS_TTL_SECONDS = 300
+
+
+def _settings_redis_key(project_id: str) -> str:
+    return f"settings:{project_id}"
+
+
+def invalidate_project_cache(project_id: str) -> None:
+    """Drop cached settings/document ids/retrieval results after a project mutation."""
+    with _project_cache_lock:
+        _project_settings_cache.pop(project_id, None)
+        _project_document_ids_cache.pop(project_id, None)
+    with _retrieval_context_cache_lock:
+        for key in [k for k in _retrieval_context_cache if k[0] == project_id]:
+            _retrieval_context_cache.pop(key, None)
+    if redis_client is not None:
+        try:
+            redis_client.delete(_settings_redis_key(project_id))
+        except Exception as e:
+            logger.debug("settings_cache_invalidate_failed", error=str(e))
 
 
 def get_project_settings(project_id):
     try:
+        cached_settings = _cache_get(_project_settings_cache, project_id)
+        if cached_settings is not None:
+            return cached_settings
+
+        # In-process miss - try the shared Redis layer before Supabase
+        if redis_client is not None:
+            try:
+                cached = redis_client.get(_settings_redis_key(project_id))
+                if cached:
+                    project_settings = json.loads(cached)
+                    with _project_cache_lock:
+                        _project_settings_cache[project_id] = (
+                            project_settings,
+                            time.monotonic(),
+                        )
+                    return project_settings
+            except Exception as e:
+                logger.debug("settings_cache_read_failed", error=str(e))
+
         project_settings_result = (
             supabase.table("project_settings")
             .select("*")
@@ -19,6 +125,17 @@ def get_project_settings(project_id):
             raise HTTPException(status_code=404, detail="Project settings not found")
 
         project_settings = project_settings_result.data[0]
+        with _project_cache_lock:
+            _project_settings_cache[project_id] = (project_settings, time.monotonic())
+        if redis_client is not None:
+            try:
+                redis_client.setex(
+                    _settings_redis_key(project_id),
+                    PROJECT_SETTINGS_REDIS_TTL_SECONDS,
+                    json.dumps(project_settings),
+                )
+            except Exception as e:
+                logger.debug("settings_cache_write_failed", error=str(e))
         return project_settings
     except Exception as e:
         raise Exception(f"Failed to get project settings: {str(e)}")
@@ -26,6 +143,10 @@ def get_project_settings(project_id):
 
 def get_project_document_ids(project_id):
     try:
+        cached_document_ids = _cache_get(_project_document_ids_cache, project_id)
+        if cached_document_ids is not None:
+            return cached_document_ids
+
         document_ids_result = (
             supabase.table("project_documents")
             .select("id")
@@ -33,10 +154,11 @@ def get_project_document_ids(project_id):
             .execute()
         )
 
-        if not document_ids_result.data:
-            raise HTTPException(status_code=404, detail="Document IDs not found")
-
-        document_ids = [document["id"] for document in document_ids_result.data]
+        # An empty project is a valid state, not an error - return [] so
+        # callers can short-circuit instead of surfacing a 404.
+        document_ids = [document["id"] for document in document_ids_result.data or []]
+        with _project_cache_lock:
+            _project_document_ids_cache[project_id] = (document_ids, time.monotonic())
         return document_ids
     except Exception as e:
         raise Exception(f"Failed to get document IDs: {str(e)}")
@@ -260,15 +382,23 @@ def prepare_prompt_and_invoke_llm(
 
 
 def rrf_rank_and_fuse(search_results_list, weights=None, k=60):
-    """RRF (Reciprocal Rank Fusion) ranking"""
+    """RRF (Reciprocal Rank Fusion) ranking, vectorized with NumPy.
+
+    Each chunk contributes weight / (k + rank + 1) per result list it appears
+    in; contributions for the same chunk id are scatter-added in C instead of
+    accumulated through a Python dict of scores.
+    """
     if not search_results_list or not any(search_results_list):
         return []
 
     if weights is None:
         weights = [1.0 / len(search_results_list)] * len(search_results_list)
 
-    chunk_scores = {}
-    all_chunks = {}
+    # Flatten every (chunk_id, contribution) pair; keep the first-seen chunk
+    # dict per id for the final output.
+    all_chunk_ids = []
+    contributions = []
+    chunk_by_id = {}
 
     for search_idx, results in enumerate(search_results_list):
         weight = weights[search_idx]
@@ -278,18 +408,26 @@ def rrf_rank_and_fuse(search_results_list, weights=None, k=60):
             if not chunk_id:
                 continue
 
-            rrf_score = weight * (1.0 / (k + rank + 1))
+            all_chunk_ids.append(chunk_id)
+            contributions.append(weight * (1.0 / (k + rank + 1)))
+            chunk_by_id.setdefault(chunk_id, chunk)
 
-            if chunk_id in chunk_scores:
-                chunk_scores[chunk_id] += rrf_score
-            else:
-                chunk_scores[chunk_id] = rrf_score
-                all_chunks[chunk_id] = chunk
+    if not all_chunk_ids:
+        return []
 
-    sorted_chunk_ids = sorted(
-        chunk_scores.keys(), key=lambda cid: chunk_scores[cid], reverse=True
-    )
-    return [all_chunks[chunk_id] for chunk_id in sorted_chunk_ids]
+    # Scatter-add each contribution onto its unique chunk id. np.unique
+    # orders ids by sorted value, so break score ties by each id's
+    # first-seen position instead - the tie order the pre-vectorized
+    # dict-based implementation produced.
+    unique_ids, inverse_idx = np.unique(np.array(all_chunk_ids), return_inverse=True)
+    scores = np.zeros(len(unique_ids))
+    np.add.at(scores, inverse_idx, np.array(contributions))
+    first_seen = np.full(len(unique_ids), len(all_chunk_ids))
+    np.minimum.at(first_seen, inverse_idx, np.arange(len(all_chunk_ids)))
+    # lexsort sorts by the last key first: fused score desc, then first-seen
+    ranked = np.lexsort((first_seen, -scores))
+
+    return [chunk_by_id[unique_ids[i]] for i in ranked]
 
 
 def generate_query_variations(original_query: str, num_queries: int = 3) -> List[str]:
@@ -310,6 +448,104 @@ def generate_query_variations(original_query: str, num_queries: int = 3) -> List
         return [original_query]
 
 
+def dedupe_query_variations(queries, query_embeddings, similarity_threshold=0.98):
+    """Drop near-duplicate query variations before fanning out searches.
+
+    The LLM can return variations that are effectively the same question
+    ("What is X" / "What's X"); each duplicate costs a full search with no
+    retrieval benefit. Dedupe in two passes:
+    1. Exact duplicates after whitespace/case normalization.
+    2. Embedding near-duplicates - greedily keep the first of any pair
+       whose cosine similarity exceeds similarity_threshold.
+
+    Returns the pruned (queries, query_embeddings) pair, order preserved
+    so the original query always survives.
+    """
+    # * Pass 1: normalized-text dedupe, keeping the first occurrence
+    seen_keys = set()
+    kept_indices = []
+    for index, query in enumerate(queries):
+        key = " ".join(query.split()).lower()
+        if key in seen_keys:
+            continue
+        seen_keys.add(key)
+        kept_indices.append(index)
+
+    if len(kept_indices) > 1:
+        # * Pass 2: cosine near-duplicate dedupe on the embedding matrix
+        matrix = np.array([query_embeddings[i] for i in kept_indices])
+        matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+        similarities = matrix @ matrix.T
+        survivor_positions = []
+        for position in range(len(kept_indices)):
+            if any(
+                similarities[position][earlier] >= similarity_threshold
+                for earlier in survivor_positions
+            ):
+                continue
+            survivor_positions.append(position)
+        kept_indices = [kept_indices[p] for p in survivor_positions]
+
+    if len(kept_indices) < len(queries):
+        logger.debug(
+            "query_variations_deduped",
+            original_count=len(queries),
+            deduped_count=len(kept_indices),
+        )
+
+    return (
+        [queries[i] for i in kept_indices],
+        [query_embeddings[i] for i in kept_indices],
+    )
+
+
+# Cached chat history lives in Redis (the instance already backing the
+# Celery broker) as a LIST of message dicts per chat, appended on every new
+# message. Turns the per-turn O(N-messages) SELECT into one O(1) LRANGE.
+CHAT_HISTORY_CACHE_MAX_MESSAGES = 200
+
+
+def _chat_history_cache_key(chat_id: str) -> str:
+    return f"chat:{chat_id}:history"
+
+
+def append_chat_history_message(chat_id: str, message_row: Dict):
+    """Append a freshly-inserted message to the cached chat history.
+
+    Only appends when the chat is already cached; a missing key is left to
+    be populated by the next get_chat_history call. Cache failures are
+    logged and ignored - Supabase remains the source of truth.
+    """
+    if redis_client is None:
+        return
+    try:
+        key = _chat_history_cache_key(chat_id)
+        if redis_client.exists(key):
+            redis_client.rpush(
+                key,
+                json.dumps(
+                    {
+                        "id": message_row.get("id"),
+                        "role": message_row.get("role", "user"),
+                        "content": message_row.get("content", ""),
+                    }
+                ),
+            )
+            redis_client.ltrim(key, -CHAT_HISTORY_CACHE_MAX_MESSAGES, -1)
+    except Exception as e:
+        logger.warning("chat_history_cache_append_failed", error=str(e))
+
+
+def invalidate_chat_history_cache(chat_id: str):
+    """Drop the cached history, e.g. when the chat is deleted."""
+    if redis_client is None:
+        return
+    try:
+        redis_client.delete(_chat_history_cache_key(chat_id))
+    except Exception as e:
+        logger.warning("chat_history_cache_invalidate_failed", error=str(e))
+
+
 def get_chat_history(
     chat_id: str, exclude_message_id: str = None
 ) -> List[Dict[str, str]]:
@@ -317,7 +553,9 @@ def get_chat_history(
     Fetch and format chat history for agent context.
 
     Retrieves the last 10 messages (5 user + 5 assistant) from the chat,
-    excluding the current message being processed.
+    excluding the current message being processed. Served from the Redis
+    history list when cached; falls back to Supabase (and warms the cache)
+    otherwise.
 
     Args:
         chat_id: The ID of the chat
@@ -327,24 +565,54 @@ def get_chat_history(
         List of message dictionaries with 'role' and 'content' keys
     """
     try:
-        query = (
-            supabase.table("messages")
-            .select("id, role, content")
-            .eq("chat_id", chat_id)
-            .order("created_at", desc=False)
-        )
-
-        # Exclude current message if provided
+        messages = None
+        if redis_client is not None:
+            try:
+                cached_rows = redis_client.lrange(
+                    _chat_history_cache_key(chat_id), 0, -1
+                )
+                if cached_rows:
+                    messages = [json.loads(row) for row in cached_rows]
+            except Exception as e:
+                logger.warning("chat_history_cache_read_failed", error=str(e))
+
+        if messages is None:
+            # Bounded, newest-first read backed by the (chat_id,
+            # created_at DESC) index - never fetches more rows than the
+            # cache would hold, regardless of chat length.
+            messages_result = (
+                supabase.table("messages")
+                .select("id, role, content")
+                .eq("chat_id", chat_id)
+                .order("created_at", desc=True)
+                .limit(CHAT_HISTORY_CACHE_MAX_MESSAGES)
+                .execute()
+            )
+            # Flip back to chronological order for slicing and the cache
+            messages = list(reversed(messages_result.data or []))
+
+            # Warm the cache with the full (capped) history for next turn
+            if redis_client is not None and messages:
+                try:
+                    key = _chat_history_cache_key(chat_id)
+                    pipeline = redis_client.pipeline()
+                    pipeline.delete(key)
+                    pipeline.rpush(key, *[json.dumps(msg) for msg in messages])
+                    pipeline.ltrim(key, -CHAT_HISTORY_CACHE_MAX_MESSAGES, -1)
+                    pipeline.execute()
+                except Exception as e:
+                    logger.warning("chat_history_cache_warm_failed", error=str(e))
+
+        # Exclude current message if provided (cache rows keep their ids
+        # precisely so this filter works on both paths)
         if exclude_message_id:
-            query = query.neq("id", exclude_message_id)
-
-        messages_result = query.execute()
+            messages = [msg for msg in messages if msg.get("id") != exclude_message_id]
 
-        if not messages_result.data:
+        if not messages:
             return []
 
         # Get last 10 messages (limit to 10 total messages)
-        recent_messages = messages_result.data[-10:]
+        recent_messages = messages[-10:]
 
         # Format messages for agent
         formatted_history = []
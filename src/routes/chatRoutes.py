@@ -4,16 +4,107 @@ from src.agents.simple_agent.agent import create_simple_rag_agent
 from src.services.supabase import supabase
 from src.services.clerkAuth import get_current_user_clerk_id
 from src.models.index import ChatCreate, MessageCreate, MessageRole
-from src.rag.retrieval.utils import get_project_settings, get_chat_history
+from src.rag.retrieval.utils import (
+    get_project_settings,
+    get_chat_history,
+    append_chat_history_message,
+    invalidate_chat_history_cache,
+)
+from src.rag.retrieval.index import retrieve_context
 from src.config.logging import get_logger, set_project_id, set_user_id
-from fastapi import APIRouter
 from fastapi.responses import StreamingResponse
-import json
+import asyncio
+import orjson
+import uuid
 
 logger = get_logger(__name__)
 
 router = APIRouter(tags=["chatRoutes"])
 
+# SSE token frames are micro-batched: flush after this many tokens or this
+# much elapsed time, whichever comes first. Cuts the per-token JSON encode +
+# send() syscall down to one per batch without visible streaming lag.
+TOKEN_FLUSH_COUNT = 8
+TOKEN_FLUSH_SECONDS = 0.025
+
+
+def _sse(event: str, data: dict) -> bytes:
+    """Build an SSE frame as bytes - orjson serializes straight to bytes,
+    skipping the dict -> str -> utf-8 hop of json.dumps in an f-string."""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+# Token frames are the hot loop - skip the event-name encode/concat of _sse
+# by pre-encoding the frame prefix once.
+_TOKEN_PREFIX = b"event: token\ndata: "
+
+
+def _token_frame(content: str) -> bytes:
+    return _TOKEN_PREFIX + orjson.dumps({"content": content}) + b"\n\n"
+
+
+# Status frames never change - serialize them once at import time instead of
+# re-encoding the same payload on every stream.
+STATUS_THINKING = _sse("status", {"status": "Thinking..."})
+STATUS_SEARCHING_DOCUMENTS = _sse("status", {"status": "Searching documents..."})
+STATUS_SEARCHING_WEB = _sse("status", {"status": "Searching the web..."})
+STATUS_GENERATING_RESPONSE = _sse("status", {"status": "Generating response..."})
+
+# Keep strong references to fire-and-forget persistence tasks so the event
+# loop can't garbage-collect them mid-flight
+_background_tasks = set()
+
+
+async def _persist_ai_response(chat_id: str, ai_response_insert_data: dict):
+    """Write the streamed AI response to Supabase after the done event.
+
+    Runs off the stream's critical path; on failure the error is logged and
+    the message is lost from history (the client already has the content).
+    """
+    try:
+        result = await asyncio.to_thread(
+            lambda: supabase.table("messages").insert(ai_response_insert_data).execute()
+        )
+        if not result.data:
+            logger.error(
+                "ai_response_persist_failed", chat_id=chat_id, reason="no_data_returned"
+            )
+            return
+        await asyncio.to_thread(append_chat_history_message, chat_id, result.data[0])
+    except Exception as e:
+        logger.error(
+            "ai_response_persist_exception", chat_id=chat_id, error=str(e), exc_info=True
+        )
+
+
+def _schedule_ai_response_persist(chat_id: str, ai_response_insert_data: dict):
+    task = asyncio.create_task(_persist_ai_response(chat_id, ai_response_insert_data))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def _speculative_retrieve(project_id: str, user_query: str):
+    """Warm the retrieval cache for the raw user question.
+
+    Runs concurrently with the guardrail check and the agent's planning
+    turn; when the agent's rag_search passes the question through
+    (the common case), retrieve_context becomes a cache hit and the
+    retrieval latency is hidden. If the guardrail rejects or the agent
+    rephrases, the entry simply ages out of the cache.
+    """
+    try:
+        retrieve_context(project_id, user_query)
+    except Exception:
+        pass
+
+
+def _schedule_speculative_retrieve(project_id: str, user_query: str):
+    task = asyncio.create_task(
+        asyncio.to_thread(_speculative_retrieve, project_id, user_query)
+    )
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
 """
 `/api/chat`
 
@@ -30,14 +121,16 @@ async def create_chat(
     chat: ChatCreate, current_user_clerk_id: str = Depends(get_current_user_clerk_id)
 ):
     try:
-        logger.info("create_chat_started", project_id=chat.project_id)
+        logger.debug("create_chat_started", project_id=chat.project_id)
         chat_insert_data = {
             "title": chat.title,
             "project_id": chat.project_id,
             "clerk_id": current_user_clerk_id,
         }
-        chat_creation_result = (
-            supabase.table("chats").insert(chat_insert_data).execute()
+        # The supabase client is sync - run it off the event loop so one
+        # request's round-trip never stalls every other in-flight request.
+        chat_creation_result = await asyncio.to_thread(
+            lambda: supabase.table("chats").insert(chat_insert_data).execute()
         )
 
         if not chat_creation_result.data:
@@ -51,11 +144,13 @@ async def create_chat(
             "data": chat_creation_result.data[0],
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("create_chat_exception", error=str(e), exc_info=True)
         raise HTTPException(
             status_code=500,
-            detail=f"An internal server error occurred while creating chat: {str(e)}",
+            detail="An internal server error occurred while creating chat",
         )
 
 
@@ -64,9 +159,9 @@ async def delete_chat(
     chat_id: str, current_user_clerk_id: str = Depends(get_current_user_clerk_id)
 ):
     try:
-        logger.info("delete_chat_started", chat_id=chat_id)
-        chat_deletion_result = (
-            supabase.table("chats")
+        logger.debug("delete_chat_started", chat_id=chat_id)
+        chat_deletion_result = await asyncio.to_thread(
+            lambda: supabase.table("chats")
             .delete()
             .eq("id", chat_id)
             .eq("clerk_id", current_user_clerk_id)
@@ -76,19 +171,22 @@ async def delete_chat(
             logger.warning("delete_chat_not_found", chat_id=chat_id)
             raise HTTPException(status_code=404, detail="Chat not found")
 
+        invalidate_chat_history_cache(chat_id)
         logger.info("delete_chat_success", chat_id=chat_id)
         return {
             "success": True,
             "message": "Chat deleted successfully",
             "data": chat_deletion_result.data[0],
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
             "delete_chat_exception", chat_id=chat_id, error=str(e), exc_info=True
         )
         raise HTTPException(
             status_code=500,
-            detail=f"An internal server error occurred while deleting chat {chat_id}: {str(e)}",
+            detail=f"An internal server error occurred while deleting chat {chat_id}",
         )
 
 
@@ -97,43 +195,48 @@ async def get_chat(
     chat_id: str, current_user_clerk_id: str = Depends(get_current_user_clerk_id)
 ):
     try:
-        logger.info("get_chat_started", chat_id=chat_id)
-        # Verify if the chat exists and belongs to the current user
-        # Selecting '*' to embeded the messages in the chat object.
-        chat_ownership_verification_result = (
-            supabase.table("chats")
-            .select("*")
+        logger.debug("get_chat_started", chat_id=chat_id)
+        # Verify ownership AND fetch the messages in ONE query - PostgREST
+        # embeds the related messages rows via the chat_id foreign key, so
+        # the chat + messages round-trips collapse into a single request.
+        # The embedded read is bounded: named columns only (no embeddings or
+        # other wide fields), newest 200 messages, backed by the
+        # (chat_id, created_at DESC) index.
+        chat_with_messages_result = await asyncio.to_thread(
+            lambda: supabase.table("chats")
+            .select("*, messages(id, role, content, citations, created_at)")
             .eq("id", chat_id)
             .eq("clerk_id", current_user_clerk_id)
+            .order("created_at", desc=True, foreign_table="messages")
+            .limit(200, foreign_table="messages")
             .execute()
         )
 
-        if not chat_ownership_verification_result.data:
+        if not chat_with_messages_result.data:
             logger.warning("get_chat_not_found_or_forbidden", chat_id=chat_id)
             raise HTTPException(
                 status_code=404,
                 detail="Chat not found or you don't have permission to access it",
             )
 
-        chat_result = chat_ownership_verification_result.data[0]
-
-        messages_result = (
-            supabase.table("messages").select("*").eq("chat_id", chat_id).execute()
-        )
-        chat_result["messages"] = messages_result.data
+        chat_result = chat_with_messages_result.data[0]
+        # Rows arrive newest-first (for the LIMIT); present chronologically
+        chat_result["messages"] = list(reversed(chat_result.get("messages") or []))
 
-        logger.info("get_chat_success", chat_id=chat_id)
+        logger.debug("get_chat_success", chat_id=chat_id)
         return {
             "success": True,
             "message": "Chat retrieved successfully",
             "data": chat_result,
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("get_chat_exception", chat_id=chat_id, error=str(e), exc_info=True)
         raise HTTPException(
             status_code=500,
-            detail=f"An internal server error occurred while getting chat {chat_id}: {str(e)}",
+            detail=f"An internal server error occurred while getting chat {chat_id}",
         )
 
 
@@ -153,7 +256,7 @@ async def create_message(
     Step 5 : Insert the AI Response into the database.
     """
     try:
-        logger.info("create_message_started", chat_id=chat_id, project_id=project_id)
+        logger.debug("create_message_started", chat_id=chat_id, project_id=project_id)
         # Step 1 : Insert the message into the database.
         message = message.content
         message_insert_data = {
@@ -162,24 +265,50 @@ async def create_message(
             "clerk_id": current_user_clerk_id,
             "role": MessageRole.USER.value,
         }
-        message_creation_result = (
-            supabase.table("messages").insert(message_insert_data).execute()
+        # Steps 1-3 hit independent tables - run the user-message insert,
+        # the settings read and the history read concurrently instead of
+        # paying three serial round-trips. The insert and the history read
+        # race, so the history may or may not already contain the message
+        # being processed - the trailing-duplicate drop below handles it.
+        (
+            message_creation_result,
+            project_settings,
+            chat_history,
+        ) = await asyncio.gather(
+            asyncio.to_thread(
+                lambda: supabase.table("messages").insert(message_insert_data).execute()
+            ),
+            asyncio.to_thread(get_project_settings, project_id),
+            asyncio.to_thread(get_chat_history, chat_id),
+            return_exceptions=True,
         )
 
+        if isinstance(message_creation_result, Exception):
+            raise message_creation_result
+        if isinstance(chat_history, Exception):
+            raise chat_history
+        if (
+            chat_history
+            and chat_history[-1]["role"] == MessageRole.USER.value
+            and chat_history[-1]["content"] == message
+        ):
+            chat_history = chat_history[:-1]
+
         if not message_creation_result.data:
             logger.error("create_message_failed_user_msg", chat_id=chat_id)
             raise HTTPException(status_code=422, detail="Failed to create message")
 
-        # Step 2 : Get Project Settings from the database - Retrieval will be performed by the agent.
-        # Based on the agent_type, Retrieval will be performed by the agent.
-        try:
-            project_settings = get_project_settings(project_id)
-            agent_type = project_settings.get("agent_type", "simple")
-        except Exception as e:
+        append_chat_history_message(chat_id, message_creation_result.data[0])
+
+        # A settings failure only downgrades the agent type, same as before.
+        if isinstance(project_settings, Exception):
             agent_type = "simple"
+        else:
+            agent_type = project_settings.get("agent_type", "simple")
 
-        # Step 3: Get chat history
-        chat_history = get_chat_history(chat_id)
+        # Start retrieval for the raw question now so the agent's rag_search
+        # call usually lands on a warm cache (see _speculative_retrieve)
+        _schedule_speculative_retrieve(project_id, message)
 
         # Step 4: Create the appropriate agent
         if agent_type == "simple":
@@ -189,7 +318,10 @@ async def create_message(
             agent = create_supervisor_agent(project_id, chat_history=chat_history)
 
         # Step 5: Insert the AI Response into the database.
-        result = agent.invoke({"messages": [{"role": "user", "content": message}]})
+        # agent.invoke blocks for the full generation - keep it off the loop.
+        result = await asyncio.to_thread(
+            agent.invoke, {"messages": [{"role": "user", "content": message}]}
+        )
         final_response = result["messages"][-1].content
         citations = result.get("citations", [])
 
@@ -200,13 +332,14 @@ async def create_message(
             "role": MessageRole.ASSISTANT.value,
             "citations": citations,
         }
-        ai_response_creation_result = (
-            supabase.table("messages").insert(ai_response_insert_data).execute()
+        ai_response_creation_result = await asyncio.to_thread(
+            lambda: supabase.table("messages").insert(ai_response_insert_data).execute()
         )
         if not ai_response_creation_result.data:
             logger.error("create_message_failed_ai_resp", chat_id=chat_id)
             raise HTTPException(status_code=422, detail="Failed to create AI response")
 
+        append_chat_history_message(chat_id, ai_response_creation_result.data[0])
         logger.info("create_message_success", chat_id=chat_id)
         return {
             "success": True,
@@ -217,13 +350,15 @@ async def create_message(
             },
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
             "create_message_exception", chat_id=chat_id, error=str(e), exc_info=True
         )
         raise HTTPException(
             status_code=500,
-            detail=f"An internal server error occurred while creating message: {str(e)}",
+            detail="An internal server error occurred while creating message",
         )
 
 
@@ -259,20 +394,40 @@ async def stream_message(
                 "clerk_id": current_user_clerk_id,
                 "role": MessageRole.USER.value,
             }
-            message_creation_result = (
-                supabase.table("messages").insert(message_insert_data).execute()
+            # Steps 1-3 are independent round-trips - run the insert, the
+            # settings read and the history read concurrently to cut the
+            # time-to-first-token. The history is fetched without the
+            # exclude-current-message filter (the id doesn't exist until the
+            # insert lands); if the read races past our own insert the
+            # trailing duplicate is dropped below instead.
+            (
+                message_creation_result,
+                project_settings,
+                chat_history,
+            ) = await asyncio.gather(
+                asyncio.to_thread(
+                    lambda: supabase.table("messages")
+                    .insert(message_insert_data)
+                    .execute()
+                ),
+                asyncio.to_thread(get_project_settings, project_id),
+                asyncio.to_thread(get_chat_history, chat_id),
+                return_exceptions=True,
             )
+            if isinstance(message_creation_result, Exception):
+                raise message_creation_result
             if not message_creation_result.data:
                 logger.error(
                     "message_creation_failed",
                     chat_id=chat_id,
                     reason="no_data_returned",
                 )
-                yield f"event: error\ndata: {json.dumps({'message': 'Failed to create message'})}\n\n"
+                yield _sse("error", {"message": "Failed to create message"})
                 return
 
             user_message_data = message_creation_result.data[0]
             current_message_id = user_message_data["id"]
+            append_chat_history_message(chat_id, user_message_data)
             logger.info(
                 "user_message_created", message_id=current_message_id, chat_id=chat_id
             )  # Added: Success log
@@ -280,21 +435,31 @@ async def stream_message(
             #  Step 2 : Get Project Settings from the database - Retrieval will be performed by the agent.(Simple or Agentic)
             #   Based on the agent_type, Retrieval will be performed by the agent.
 
-            try:
-                project_settings = get_project_settings(project_id)
-                agent_type = project_settings.get("agent_type", "simple")
-            except Exception as e:
+            if isinstance(project_settings, Exception):
                 logger.warning(
-                    "settings_retrieval_failed_defaulting_to_simple", error=str(e)
+                    "settings_retrieval_failed_defaulting_to_simple",
+                    error=str(project_settings),
                 )
                 agent_type = "simple"
+            else:
+                agent_type = project_settings.get("agent_type", "simple")
 
             logger.info("agent_type_determined", agent_type=agent_type)
 
-            # Step 3: Get chat history
-            chat_history = get_chat_history(
-                chat_id, exclude_message_id=current_message_id
-            )
+            # Step 3: Finalize chat history from the concurrent read -
+            # drop the just-inserted message if the read already saw it.
+            if isinstance(chat_history, Exception):
+                chat_history = []
+            if (
+                chat_history
+                and chat_history[-1]["role"] == MessageRole.USER.value
+                and chat_history[-1]["content"] == message_content
+            ):
+                chat_history = chat_history[:-1]
+
+            # Start retrieval for the raw question now so the agent's
+            # rag_search call usually lands on a warm cache
+            _schedule_speculative_retrieve(project_id, message_content)
 
             # Step 4: Create the appropriate agent
             if agent_type == "simple":
@@ -305,6 +470,9 @@ async def stream_message(
             # Step 5: Stream the agent response
             full_response = ""
             citations = []
+            loop = asyncio.get_running_loop()
+            token_buffer = []
+            last_flush = loop.time()
 
             # Track state to know when we're in the final response
             passed_guardrail = False
@@ -332,24 +500,29 @@ async def stream_message(
                                 else str(messages[0])
                             )
                             full_response = rejection_content
-                            yield f"event: token\ndata: {json.dumps({'content': rejection_content})}\n\n"
+                            yield _token_frame(rejection_content)
                     else:
                         passed_guardrail = True
-                        yield f"event: status\ndata: {json.dumps({'status': 'Thinking...'})}\n\n"
+                        yield STATUS_THINKING
 
                 # Status updates for tool calls
                 elif kind == "on_tool_start":
+                    # Flush buffered tokens so frames stay in order
+                    if token_buffer:
+                        yield _token_frame("".join(token_buffer))
+                        token_buffer = []
+                        last_flush = loop.time()
                     tool_called = True
                     tool_name = name
                     if tool_name == "rag_search":
-                        yield f"event: status\ndata: {json.dumps({'status': 'Searching documents...'})}\n\n"
+                        yield STATUS_SEARCHING_DOCUMENTS
                     elif tool_name == "search_web":
-                        yield f"event: status\ndata: {json.dumps({'status': 'Searching the web...'})}\n\n"
+                        yield STATUS_SEARCHING_WEB
 
                 # Detect when tool ends - next model call will be the final response
                 elif kind == "on_tool_end":
                     is_final_response = True
-                    yield f"event: status\ndata: {json.dumps({'status': 'Generating response...'})}\n\n"
+                    yield STATUS_GENERATING_RESPONSE
 
                 # Stream tokens from the model
                 elif kind == "on_chat_model_stream":
@@ -372,7 +545,15 @@ async def stream_message(
                             )
                             if content:
                                 full_response += content
-                                yield f"event: token\ndata: {json.dumps({'content': content})}\n\n"
+                                token_buffer.append(content)
+                                now = loop.time()
+                                if (
+                                    len(token_buffer) >= TOKEN_FLUSH_COUNT
+                                    or now - last_flush >= TOKEN_FLUSH_SECONDS
+                                ):
+                                    yield _token_frame("".join(token_buffer))
+                                    token_buffer = []
+                                    last_flush = now
 
                 # Capture citations from the final state
                 elif kind == "on_chain_end" and name == "LangGraph":
@@ -381,6 +562,11 @@ async def stream_message(
                     if isinstance(output, dict) and "citations" in output:
                         citations = output["citations"]
 
+            # Flush any tokens still buffered when the stream ends
+            if token_buffer:
+                yield _token_frame("".join(token_buffer))
+                token_buffer = []
+
             logger.info(
                 "agent_invocation_completed",
                 chat_id=chat_id,
@@ -395,7 +581,10 @@ async def stream_message(
                     "I apologize, but I couldn't generate a response. Please try again."
                 )
 
+            # The id is generated client-side so the done frame can carry the
+            # final message identity without waiting for the DB round-trip.
             ai_response_insert_data = {
+                "id": str(uuid.uuid4()),
                 "content": full_response,
                 "chat_id": chat_id,
                 "clerk_id": current_user_clerk_id,
@@ -404,39 +593,30 @@ async def stream_message(
             }
 
             logger.info(
-                "inserting_ai_response",
+                "message_sent_successfully",
                 chat_id=chat_id,
-                data_keys=list(ai_response_insert_data.keys()),
+                ai_message_id=ai_response_insert_data["id"],
             )
 
-            ai_response_creation_result = (
-                supabase.table("messages").insert(ai_response_insert_data).execute()
+            # Step 7: Send done event FIRST - the content is already in hand,
+            # so the user shouldn't wait on the persistence round-trip.
+            yield _sse(
+                "done",
+                {
+                    "userMessage": user_message_data,
+                    "aiMessage": ai_response_insert_data,
+                },
             )
 
-            if not ai_response_creation_result.data:
-                logger.error(
-                    "ai_response_creation_failed",
-                    chat_id=chat_id,
-                    reason="no_data_returned",
-                )  # Added: Error log
-                yield f"event: error\ndata: {json.dumps({'message': 'Failed to save AI response'})}\n\n"
-                return
-
-            ai_message_data = ai_response_creation_result.data[0]
-            logger.info(
-                "message_sent_successfully",
-                chat_id=chat_id,
-                ai_message_id=ai_message_data["id"],
-            )  # Added: Success log
-
-            # Step 7: Send done event
-            yield f"event: done\ndata: {json.dumps({'userMessage': user_message_data, 'aiMessage': ai_message_data})}\n\n"
+            # Step 6 (off the critical path): persist the AI response after
+            # the stream is complete. Failures are logged, not streamed.
+            _schedule_ai_response_persist(chat_id, ai_response_insert_data)
 
         except Exception as e:
             logger.error(
                 "send_message_error", chat_id=chat_id, error=str(e), exc_info=True
             )  # Added: Exception log
-            yield f"event: error\ndata: {json.dumps({'message': str(e)})}\n\n"
+            yield _sse("error", {"message": str(e)})
 
     return StreamingResponse(
         event_generator(),
@@ -444,5 +624,8 @@ async def stream_message(
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
+            # Opt the SSE stream out of GZipMiddleware - compression would
+            # buffer token frames instead of flushing them immediately
+            "Content-Encoding": "identity",
         },
     )
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends
 from src.services.supabase import supabase
 from src.services.clerkAuth import get_current_user_clerk_id
 from src.services.awsS3 import s3_client
 from src.config.index import appConfig
 from src.models.index import FileUploadRequest, UrlRequest, ProcessingStatus
 from src.utils.index import validate_url
+from src.rag.retrieval.utils import invalidate_project_cache
+import asyncio
 import uuid
 from src.services.celery import perform_rag_ingestion_task
 from src.config.logging import get_logger
@@ -13,6 +15,36 @@ logger = get_logger(__name__)
 
 router = APIRouter(tags=["projectFilesRoutes"])
 
+
+def _dispatch_ingestion(document_id: str) -> None:
+    """Enqueue the RAG ingestion task and persist its task_id.
+
+    Runs as a FastAPI background task (threadpool) after the response has
+    been sent - the Redis broker round-trip and the follow-up task_id
+    UPDATE don't belong on the request path. Failures are logged; the
+    document stays in "queued" status and can be re-dispatched.
+    """
+    try:
+        task_result = perform_rag_ingestion_task.delay(document_id)
+        task_id = task_result.id
+        logger.info(
+            "rag_ingestion_task_started", task_id=task_id, document_id=document_id
+        )
+
+        # Nothing reads the updated row - Prefer: return=minimal skips the
+        # RETURNING rowset on the Postgres side and its serialisation in
+        # PostgREST
+        supabase.table("project_documents").update(
+            {"task_id": task_id}, returning="minimal"
+        ).eq("id", document_id).execute()
+    except Exception as e:
+        logger.error(
+            "rag_ingestion_dispatch_failed",
+            document_id=document_id,
+            error=str(e),
+            exc_info=True,
+        )
+
 """
 `/api/project`
 
@@ -30,9 +62,11 @@ async def get_project_files(
     project_id: str, current_user_clerk_id: str = Depends(get_current_user_clerk_id)
 ):
     try:
-        logger.info("get_project_files_started", project_id=project_id)
-        project_files_result = (
-            supabase.table("project_documents")
+        logger.debug("get_project_files_started", project_id=project_id)
+        # The supabase client is sync - run it off the event loop (same
+        # pattern as the chat routes)
+        project_files_result = await asyncio.to_thread(
+            lambda: supabase.table("project_documents")
             .select("*")
             .eq("project_id", project_id)
             .eq("clerk_id", current_user_clerk_id)
@@ -40,7 +74,7 @@ async def get_project_files(
             .execute()
         )
 
-        logger.info(
+        logger.debug(
             "get_project_files_success",
             project_id=project_id,
             count=len(project_files_result.data),
@@ -50,6 +84,8 @@ async def get_project_files(
             "message": "Project files retrieved successfully",
             "data": project_files_result.data,
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
             "get_project_files_exception",
@@ -59,7 +95,7 @@ async def get_project_files(
         )
         raise HTTPException(
             status_code=500,
-            detail=f"An internal server error occurred while retrieving project {project_id} files: {str(e)}",
+            detail=f"An internal server error occurred while retrieving project {project_id} files",
         )
 
 
@@ -78,42 +114,24 @@ async def get_upload_presigned_url(
     5. Return presigned url
     """
     try:
-        logger.info(
+        logger.debug(
             "get_presigned_url_started",
             project_id=project_id,
             filename=file_upload_request.file_name,
         )
-        # Verify project exists and belongs to the current user
-        project_ownership_verification_result = (
-            supabase.table("projects")
-            .select("id")
-            .eq("id", project_id)
-            .eq("clerk_id", current_user_clerk_id)
-            .execute()
-        )
-
-        if not project_ownership_verification_result.data:
-            logger.warning("get_presigned_url_forbidden", project_id=project_id)
-            raise HTTPException(
-                status_code=404,
-                detail="Project not found or you don't have permission to upload files to this project",
-            )
-
-        # Generate s3 key
-        file_extension = (
-            file_upload_request.file_name.split(".")[-1]
-            if "." in file_upload_request.file_name
-            else ""
-        )
-        unique_file_id = uuid.uuid4()
+        # Generate s3 key - rpartition avoids the list allocation of
+        # split(), and uuid4().hex skips the dashed-string formatting
+        _, has_extension, file_extension = file_upload_request.file_name.rpartition(".")
         s3_key = (
-            f"projects/{project_id}/documents/{unique_file_id}.{file_extension}"
-            if file_extension
-            else f"projects/{project_id}/documents/{unique_file_id}"
+            f"projects/{project_id}/documents/{uuid.uuid4().hex}"
+            f"{'.' + file_extension if has_extension else ''}"
         )
 
         # Generate upload presigned url (will expire in 1 hour)
-        presigned_url = s3_client.generate_presigned_url(
+        # boto3 is sync - keep it off the event loop (same pattern as the
+        # supabase calls in the chat routes)
+        presigned_url = await asyncio.to_thread(
+            s3_client.generate_presigned_url,
             "put_object",
             Params={
                 "Bucket": appConfig["s3_bucket_name"],
@@ -130,28 +148,29 @@ async def get_upload_presigned_url(
                 detail="Failed to generate upload presigned url",
             )
 
-        # Generate database record with pending status
-        document_creation_result = (
-            supabase.table("project_documents")
-            .insert(
+        # Verify ownership AND create the pending document record in ONE
+        # atomic RPC - an empty result means the project doesn't exist or
+        # isn't owned by the caller
+        document_creation_result = await asyncio.to_thread(
+            lambda: supabase.rpc(
+                "create_pending_document",
                 {
-                    "project_id": project_id,
-                    "filename": file_upload_request.file_name,
-                    "s3_key": s3_key,
-                    "file_size": file_upload_request.file_size,
-                    "file_type": file_upload_request.file_type,
-                    "processing_status": ProcessingStatus.PENDING,
-                    "clerk_id": current_user_clerk_id,
-                }
-            )
-            .execute()
+                    "p_project_id": project_id,
+                    "p_clerk_id": current_user_clerk_id,
+                    "p_filename": file_upload_request.file_name,
+                    "p_s3_key": s3_key,
+                    "p_file_size": file_upload_request.file_size,
+                    "p_file_type": file_upload_request.file_type,
+                    "p_processing_status": ProcessingStatus.PENDING,
+                },
+            ).execute()
         )
 
         if not document_creation_result.data:
-            logger.error("get_presigned_url_db_failed", project_id=project_id)
+            logger.warning("get_presigned_url_forbidden", project_id=project_id)
             raise HTTPException(
-                status_code=422,
-                detail="Failed to create project document - invalid data provided",
+                status_code=404,
+                detail="Project not found or you don't have permission to upload files to this project",
             )
 
         logger.info("get_presigned_url_success", project_id=project_id, s3_key=s3_key)
@@ -164,6 +183,8 @@ async def get_upload_presigned_url(
                 "project_document": document_creation_result.data[0],
             },
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
             "get_presigned_url_exception",
@@ -173,119 +194,178 @@ async def get_upload_presigned_url(
         )
         raise HTTPException(
             status_code=500,
-            detail=f"An internal server error occurred while generating upload presigned url for {project_id}: {str(e)}",
+            detail=f"An internal server error occurred while generating upload presigned url for {project_id}",
         )
 
 
-@router.post("/{project_id}/files/confirm-upload-to-s3")
+@router.post("/{project_id}/files/confirm-upload-to-s3", status_code=202)
 async def confirm_file_upload_to_s3(
     project_id: str,
     confirm_file_upload_request: dict,
+    background_tasks: BackgroundTasks,
     current_user_clerk_id: str = Depends(get_current_user_clerk_id),
 ):
     try:
         s3_key = confirm_file_upload_request["s3_key"]
-        logger.info("confirm_s3_upload_started", project_id=project_id, s3_key=s3_key)
+        logger.debug("confirm_s3_upload_started", project_id=project_id, s3_key=s3_key)
         if not s3_key:
             raise HTTPException(
                 status_code=400,
                 detail="S3 key is required",
             )
 
-        # Verify file exists in database
-        document_verification_result = (
-            supabase.table("project_documents")
-            .select("id")
+        # Verify ownership and update status in ONE conditional UPDATE -
+        # scoping by (s3_key, project_id, clerk_id) makes the separate
+        # verification SELECT redundant: zero updated rows means not found
+        # or not permitted.
+        # Status is "queued", not "completed", because the file is not yet
+        # processed - the RAG pipeline will process it.
+        document_update_result = await asyncio.to_thread(
+            lambda: supabase.table("project_documents")
+            .update(
+                {
+                    "processing_status": ProcessingStatus.QUEUED,
+                }
+            )
             .eq("s3_key", s3_key)
             .eq("project_id", project_id)
             .eq("clerk_id", current_user_clerk_id)
             .execute()
         )
 
-        if not document_verification_result.data:
+        if not document_update_result.data:
             logger.warning("confirm_s3_upload_not_found_forbidden", s3_key=s3_key)
             raise HTTPException(
                 status_code=404,
                 detail="File not found or you don't have permission to confirm upload to S3 for this file",
             )
 
-        # Update file status to "queued"
-        # Not 'completed' because the file is not yet processed - RAG pipeline will process it
-        document_update_result = (
-            supabase.table("project_documents")
-            .update(
-                {
-                    "processing_status": ProcessingStatus.QUEUED,
-                }
-            )
-            .eq("s3_key", s3_key)
-            .execute()
-        )
-
         # * Start Background pre-processing of this document using Celery Task
+        # Dispatch (broker round-trip + task_id UPDATE) runs after the
+        # response is sent - the client only needs the "queued" row.
         document_id = document_update_result.data[0]["id"]
-        # * Celery Task - returns a task id - Store to track later
-        task_result = perform_rag_ingestion_task.delay(document_id)
-        task_id = task_result.id
-        logger.info(
-            "confirm_s3_upload_task_started", task_id=task_id, document_id=document_id
+        background_tasks.add_task(_dispatch_ingestion, document_id)
+
+        # New document is now part of the project's searchable set
+        invalidate_project_cache(project_id)
+
+        logger.info("confirm_s3_upload_success", document_id=document_id)
+        return {
+            "success": True,
+            "message": "File upload to S3 confirmed successfully And Started Background Pre-Processing of this file",
+            "data": {
+                "file_update_result": document_update_result.data[0],
+            },
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(
+            "confirm_s3_upload_exception",
+            project_id=project_id,
+            error=str(e),
+            exc_info=True,
+        )
+        raise HTTPException(
+            status_code=500,
+            detail=f"An internal server error occurred while confirming upload to S3 for {project_id}",
+        )
+
+
+@router.post("/{project_id}/files/confirm-upload-to-s3/batch", status_code=202)
+async def confirm_file_uploads_to_s3_batch(
+    project_id: str,
+    confirm_file_uploads_request: dict,
+    background_tasks: BackgroundTasks,
+    current_user_clerk_id: str = Depends(get_current_user_clerk_id),
+):
+    try:
+        s3_keys = confirm_file_uploads_request.get("s3_keys")
+        logger.debug(
+            "confirm_s3_upload_batch_started",
+            project_id=project_id,
+            count=len(s3_keys) if s3_keys else 0,
         )
+        if not s3_keys or not isinstance(s3_keys, list):
+            raise HTTPException(
+                status_code=400,
+                detail="A non-empty list of S3 keys is required",
+            )
 
-        # Update the project document record with the task_id
-        document_update_result = (
-            supabase.table("project_documents")
+        # One conditional UPDATE for the whole batch - N confirm calls
+        # collapse into a single PostgREST round trip, scoped by
+        # (project_id, clerk_id) for ownership.
+        documents_update_result = await asyncio.to_thread(
+            lambda: supabase.table("project_documents")
             .update(
                 {
-                    "task_id": task_id,
+                    "processing_status": ProcessingStatus.QUEUED,
                 }
             )
-            .eq("id", document_id)
+            .in_("s3_key", s3_keys)
+            .eq("project_id", project_id)
+            .eq("clerk_id", current_user_clerk_id)
             .execute()
         )
-        if not document_update_result.data:
-            logger.error("confirm_s3_upload_update_failed", document_id=document_id)
+
+        if not documents_update_result.data:
+            logger.warning(
+                "confirm_s3_upload_batch_not_found_forbidden", project_id=project_id
+            )
             raise HTTPException(
-                status_code=422,
-                detail="Failed to update project document record with task_id",
+                status_code=404,
+                detail="No matching files found or you don't have permission to confirm these uploads",
             )
 
-        logger.info("confirm_s3_upload_success", document_id=document_id)
+        # Dispatch one ingestion task per confirmed document after the
+        # response is sent, same as the single-file endpoint.
+        for updated_document in documents_update_result.data:
+            background_tasks.add_task(_dispatch_ingestion, updated_document["id"])
+
+        # New documents are now part of the project's searchable set
+        invalidate_project_cache(project_id)
+
+        logger.info(
+            "confirm_s3_upload_batch_success",
+            project_id=project_id,
+            count=len(documents_update_result.data),
+        )
         return {
             "success": True,
-            "message": "File upload to S3 confirmed successfully And Started Background Pre-Processing of this file",
+            "message": "File uploads to S3 confirmed successfully And Started Background Pre-Processing of these files",
             "data": {
-                "file_update_result": document_update_result.data[0],
+                "file_update_results": documents_update_result.data,
             },
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
-            "confirm_s3_upload_exception",
+            "confirm_s3_upload_batch_exception",
             project_id=project_id,
             error=str(e),
             exc_info=True,
         )
         raise HTTPException(
             status_code=500,
-            detail=f"An internal server error occurred while confirming upload to S3 for {project_id}: {str(e)}",
+            detail=f"An internal server error occurred while confirming batch upload to S3 for {project_id}",
         )
 
 
-@router.post("/{project_id}/files/process-url")
+@router.post("/{project_id}/files/process-url", status_code=202)
 async def process_url(
     project_id: str,
     url: UrlRequest,
+    background_tasks: BackgroundTasks,
     current_user_clerk_id: str = Depends(get_current_user_clerk_id),
 ):
     try:
-        # Validate URL
+        # Validate URL (scheme normalization happens in the UrlRequest
+        # validator, inside Pydantic's compiled validation pass)
         url = url.url
-        logger.info("process_url_started", project_id=project_id, url=url)
-        if url.startswith("http://") or url.startswith("https://"):
-            url = url
-        else:
-            url = f"https://{url}"
-
+        logger.debug("process_url_started", project_id=project_id, url=url)
         if not validate_url(url):
             raise HTTPException(
                 status_code=400,
@@ -293,8 +373,8 @@ async def process_url(
             )
 
         # Add website Url to database
-        document_creation_result = (
-            supabase.table("project_documents")
+        document_creation_result = await asyncio.to_thread(
+            lambda: supabase.table("project_documents")
             .insert(
                 {
                     "project_id": project_id,
@@ -318,34 +398,14 @@ async def process_url(
                 detail="Failed to create project document with URL Record - invalid data provided",
             )
 
-        # TODO : Start Background Pre-Processing of this URL
         # * Start Background pre-processing of this document using Celery Task
+        # Dispatch (broker round-trip + task_id UPDATE) runs after the
+        # response is sent - the client only needs the "queued" row.
         document_id = document_creation_result.data[0]["id"]
-        # * Celery Task - returns a task id - Store to track later
-        task_result = perform_rag_ingestion_task.delay(document_id)
-        task_id = task_result.id
-        logger.info(
-            "process_url_task_started", task_id=task_id, document_id=document_id
-        )
-
-        #  Update the project document record with the task_id
-        document_update_result = (
-            supabase.table("project_documents")
-            .update(
-                {
-                    "task_id": task_id,
-                }
-            )
-            .eq("id", document_id)
-            .execute()
-        )
+        background_tasks.add_task(_dispatch_ingestion, document_id)
 
-        if not document_update_result.data:
-            logger.error("process_url_update_failed", document_id=document_id)
-            raise HTTPException(
-                status_code=422,
-                detail="Failed to update project document record with task_id",
-            )
+        # New document is now part of the project's searchable set
+        invalidate_project_cache(project_id)
 
         logger.info("process_url_success", document_id=document_id)
         return {
@@ -356,13 +416,15 @@ async def process_url(
             },
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
             "process_url_exception", project_id=project_id, error=str(e), exc_info=True
         )
         raise HTTPException(
             status_code=500,
-            detail=f"An internal server error occurred while processing urls for {project_id}: {str(e)}",
+            detail=f"An internal server error occurred while processing urls for {project_id}",
         )
 
 
@@ -373,53 +435,47 @@ async def delete_project_document(
     current_user_clerk_id: str = Depends(get_current_user_clerk_id),
 ):
     try:
-        logger.info(
+        logger.debug(
             "delete_document_started", project_id=project_id, document_id=document_id
         )
-        # Verify document exists and belongs to the current user and Take complete project document record
-        document_ownership_verification_result = (
-            supabase.table("project_documents")
-            .select("*")
+        # Verify ownership and delete in ONE conditional DELETE - the
+        # returned row doubles as the ownership proof and carries the
+        # s3_key needed for the S3 cleanup below.
+        document_deletion_result = await asyncio.to_thread(
+            lambda: supabase.table("project_documents")
+            .delete()
             .eq("id", document_id)
             .eq("project_id", project_id)
             .eq("clerk_id", current_user_clerk_id)
             .execute()
         )
 
-        if not document_ownership_verification_result.data:
+        if not document_deletion_result.data:
             raise HTTPException(
                 status_code=404,
                 detail="Document not found or you don't have permission to delete this document",
             )
 
         # Delete file from S3 (only for actual files, not for URLs)
-        s3_key = document_ownership_verification_result.data[0]["s3_key"]
+        s3_key = document_deletion_result.data[0]["s3_key"]
         if s3_key:
-            s3_client.delete_object(Bucket=appConfig["s3_bucket_name"], Key=s3_key)
-
-        # Delete document from database
-        document_deletion_result = (
-            supabase.table("project_documents")
-            .delete()
-            .eq("id", document_id)
-            .eq("project_id", project_id)
-            .eq("clerk_id", current_user_clerk_id)
-            .execute()
-        )
-
-        if not document_deletion_result.data:
-            logger.error("delete_document_failed", document_id=document_id)
-            raise HTTPException(
-                status_code=404,
-                detail="Failed to delete document",
+            await asyncio.to_thread(
+                s3_client.delete_object,
+                Bucket=appConfig["s3_bucket_name"],
+                Key=s3_key,
             )
 
+        # Deleted document must drop out of the cached searchable set
+        invalidate_project_cache(project_id)
+
         logger.info("delete_document_success", document_id=document_id)
         return {
             "success": True,
             "message": "Document deleted successfully",
             "data": document_deletion_result.data[0],
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
             "delete_document_exception",
@@ -429,7 +485,7 @@ async def delete_project_document(
         )
         raise HTTPException(
             status_code=500,
-            detail=f"An internal server error occurred while deleting project document {document_id} for {project_id}: {str(e)}",
+            detail=f"An internal server error occurred while deleting project document {document_id} for {project_id}",
         )
 
 
@@ -440,20 +496,22 @@ async def get_project_document_chunks(
     current_user_clerk_id: str = Depends(get_current_user_clerk_id),
 ):
     try:
-        logger.info(
+        logger.debug(
             "get_chunks_started", project_id=project_id, document_id=document_id
         )
-        # Verify document exists and belongs to the current user and Take complete project document record
-        document_ownership_verification_result = (
-            supabase.table("project_documents")
-            .select("*")
+        # Verify document exists and belongs to the current user - pure
+        # existence check, so ask PostgREST for the count only (HEAD, no
+        # row payload) instead of pulling the whole record back.
+        document_ownership_verification_result = await asyncio.to_thread(
+            lambda: supabase.table("project_documents")
+            .select("id", count="exact", head=True)
             .eq("id", document_id)
             .eq("project_id", project_id)
             .eq("clerk_id", current_user_clerk_id)
             .execute()
         )
 
-        if not document_ownership_verification_result.data:
+        if not document_ownership_verification_result.count:
             logger.warning(
                 "get_chunks_document_not_found_forbidden", document_id=document_id
             )
@@ -462,15 +520,20 @@ async def get_project_document_chunks(
                 detail="Document not found or you don't have permission to delete this document",
             )
 
-        document_chunks_result = (
-            supabase.table("document_chunks")
-            .select("*")
+        # Named columns: the 1536-dim embedding vector and the fts
+        # tsvector are never rendered and dwarf the rest of the row
+        document_chunks_result = await asyncio.to_thread(
+            lambda: supabase.table("document_chunks")
+            .select(
+                "id, document_id, content, chunk_index, page_number, "
+                "char_count, type, original_content, created_at"
+            )
             .eq("document_id", document_id)
             .order("chunk_index")
             .execute()
         )
 
-        logger.info(
+        logger.debug(
             "get_chunks_success",
             document_id=document_id,
             count=len(document_chunks_result.data),
@@ -480,11 +543,13 @@ async def get_project_document_chunks(
             "message": "Project document chunks retrieved successfully",
             "data": document_chunks_result.data or [],
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
             "get_chunks_exception", document_id=document_id, error=str(e), exc_info=True
         )
         raise HTTPException(
             status_code=500,
-            detail=f"An internal server error occurred while getting project document chunks for {document_id} for {project_id}: {str(e)}",
+            detail=f"An internal server error occurred while getting project document chunks for {document_id} for {project_id}",
         )
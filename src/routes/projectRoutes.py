@@ -1,14 +1,80 @@
+import asyncio
+import hashlib
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Depends
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from src.services.supabase import supabase
+from src.services.redis import redis_client
 from src.services.clerkAuth import get_current_user_clerk_id
 from src.models.index import ProjectCreate, ProjectSettings
+from src.rag.retrieval.utils import invalidate_project_cache
 from src.config.logging import get_logger
 
 logger = get_logger(__name__)
 
 router = APIRouter(tags=["projectRoutes"])
 
+# Dashboards poll the project list every few seconds with identical
+# queries - serve repeats from Redis and only hit Supabase on a miss.
+# Creates and deletes drop the key, so staleness is bounded by the TTL
+# for changes made from another instance only.
+PROJECT_LIST_CACHE_TTL_SECONDS = 60
+
+
+def _project_list_cache_key(clerk_id: str) -> str:
+    return f"projects:{clerk_id}"
+
+
+def _get_cached_project_list(clerk_id: str):
+    if redis_client is None:
+        return None
+    try:
+        cached = redis_client.get(_project_list_cache_key(clerk_id))
+        return orjson.loads(cached) if cached else None
+    except Exception as e:
+        logger.debug("project_list_cache_read_failed", error=str(e))
+        return None
+
+
+def _store_project_list(clerk_id: str, projects: list) -> None:
+    if redis_client is None:
+        return
+    try:
+        redis_client.setex(
+            _project_list_cache_key(clerk_id),
+            PROJECT_LIST_CACHE_TTL_SECONDS,
+            orjson.dumps(projects),
+        )
+    except Exception as e:
+        logger.debug("project_list_cache_write_failed", error=str(e))
+
+
+def _invalidate_project_list(clerk_id: str) -> None:
+    if redis_client is None:
+        return
+    try:
+        redis_client.delete(_project_list_cache_key(clerk_id))
+    except Exception as e:
+        logger.debug("project_list_cache_invalidate_failed", error=str(e))
+
+
+# Browser-side caching for the idempotent GETs: a content-derived ETag
+# lets repeat requests within the max-age window answer with an empty 304
+# instead of re-sending the payload. "private" keeps shared proxies from
+# caching per-user data. The tables carry no updated_at column, so the
+# tag is hashed from the serialized payload itself.
+CACHE_CONTROL_PRIVATE = "private, max-age=30"
+
+
+def _conditional_response(request: Request, response: Response, data):
+    """Set ETag/Cache-Control; return a 304 Response on If-None-Match hit."""
+    etag = f'"{hashlib.md5(orjson.dumps(data)).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL_PRIVATE}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
 """
 `/api/project`
 
@@ -24,27 +90,43 @@ Update project settings: PUT `/{project_id}/settings/update`
 
 
 @router.get("/list")
-async def get_projects(current_user_clerk_id: str = Depends(get_current_user_clerk_id)):
+async def get_projects(
+    request: Request,
+    response: Response,
+    current_user_clerk_id: str = Depends(get_current_user_clerk_id),
+):
     try:
-        logger.info("get_projects_started", user_id=current_user_clerk_id)
-        projects_query_result = (
-            supabase.table("projects")
-            .select("*")
-            .eq("clerk_id", current_user_clerk_id)
-            .execute()
-        )
+        logger.debug("get_projects_started", user_id=current_user_clerk_id)
+        cached_projects = _get_cached_project_list(current_user_clerk_id)
+        if cached_projects is None:
+            # The supabase client is sync - run it off the event loop
+            # (same pattern as the chat and file routes)
+            projects_query_result = await asyncio.to_thread(
+                lambda: supabase.table("projects")
+                .select("*")
+                .eq("clerk_id", current_user_clerk_id)
+                .execute()
+            )
+            cached_projects = projects_query_result.data
+            _store_project_list(current_user_clerk_id, cached_projects)
+
+        not_modified = _conditional_response(request, response, cached_projects)
+        if not_modified is not None:
+            return not_modified
 
-        logger.info("get_projects_success", count=len(projects_query_result.data))
+        logger.debug("get_projects_success", count=len(cached_projects))
         return {
             "success": True,
             "message": "Projects retrieved successfully",
-            "data": projects_query_result.data,
+            "data": cached_projects,
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("get_projects_exception", error=str(e), exc_info=True)
         raise HTTPException(
             status_code=500,
-            detail=f"An error occurred while fetching projects: {str(e)}",
+            detail="An error occurred while fetching projects",
         )
 
 
@@ -54,16 +136,19 @@ async def create_project(
     current_user_clerk_id: str = Depends(get_current_user_clerk_id),
 ):
     try:
-        logger.info("create_project_started", project_name=project_data.name)
-        # Insert new project into database
-        project_insert_data = {
-            "name": project_data.name,
-            "description": project_data.description,
-            "clerk_id": current_user_clerk_id,
-        }
-
-        project_creation_result = (
-            supabase.table("projects").insert(project_insert_data).execute()
+        logger.debug("create_project_started", project_name=project_data.name)
+        # Insert the project and its default settings in a single
+        # transaction on the database side - no manual rollback needed if
+        # the settings insert fails.
+        project_creation_result = await asyncio.to_thread(
+            lambda: supabase.rpc(
+                "create_project_with_defaults",
+                {
+                    "p_name": project_data.name,
+                    "p_description": project_data.description,
+                    "p_clerk_id": current_user_clerk_id,
+                },
+            ).execute()
         )
 
         if not project_creation_result.data:
@@ -73,57 +158,26 @@ async def create_project(
                 detail="Failed to create project - invalid data provided",
             )
 
-        newly_created_project = project_creation_result.data[0]
-
-        # Create default project settings for the new project
-        project_settings_data = {
-            "project_id": newly_created_project["id"],
-            "embedding_model": "text-embedding-3-large",
-            "rag_strategy": "basic",
-            "agent_type": "agentic",
-            "chunks_per_search": 10,
-            "final_context_size": 5,
-            "similarity_threshold": 0.3,
-            "number_of_queries": 5,
-            "reranking_enabled": True,
-            "reranking_model": "reranker-english-v3.0",
-            "vector_weight": 0.7,
-            "keyword_weight": 0.3,
-        }
+        created = project_creation_result.data
 
-        project_settings_creation_result = (
-            supabase.table("project_settings").insert(project_settings_data).execute()
-        )
+        _invalidate_project_list(current_user_clerk_id)
 
-        if not project_settings_creation_result.data:
-            logger.error(
-                "create_project_failed_settings", project_id=newly_created_project["id"]
-            )
-            # Rollback: Delete the project if settings creation fails
-            supabase.table("projects").delete().eq(
-                "id", newly_created_project["id"]
-            ).execute()
-            raise HTTPException(
-                status_code=422,
-                detail="Failed to create project settings - project creation rolled back",
-            )
-
-        newly_created_project_settings = project_settings_creation_result.data[0]
-
-        logger.info("create_project_success", project_id=newly_created_project["id"])
+        logger.info("create_project_success", project_id=created["project"]["id"])
         return {
             "success": True,
             "message": "Project created successfully",
             "data": {
-                "project": newly_created_project,
-                "settings": newly_created_project_settings,
+                "project": created["project"],
+                "settings": created["settings"],
             },
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("create_project_exception", error=str(e), exc_info=True)
         raise HTTPException(
             status_code=500,
-            detail=f"An internal server error occurred while creating project: {str(e)}",
+            detail="An internal server error occurred while creating project",
         )
 
 
@@ -132,17 +186,21 @@ async def delete_project(
     project_id: str, current_user_clerk_id: str = Depends(get_current_user_clerk_id)
 ):
     try:
-        logger.info("delete_project_started", project_id=project_id)
-        # Verify if the project exists and belongs to the current user
-        project_ownership_verification_result = (
-            supabase.table("projects")
-            .select("id")
+        logger.debug("delete_project_started", project_id=project_id)
+        # Verify ownership and delete in ONE conditional DELETE - zero
+        # deleted rows means the project doesn't exist or doesn't belong
+        # to the caller. CASCADE removes all related data:
+        # project_settings, project_documents, document_chunks, chats,
+        # messages, etc.
+        project_deletion_result = await asyncio.to_thread(
+            lambda: supabase.table("projects")
+            .delete()
             .eq("id", project_id)
             .eq("clerk_id", current_user_clerk_id)
             .execute()
         )
 
-        if not project_ownership_verification_result.data:
+        if not project_deletion_result.data:
             logger.warning(
                 "delete_project_not_found_or_forbidden", project_id=project_id
             )
@@ -151,26 +209,8 @@ async def delete_project(
                 detail="Project not found or you don't have permission to delete it",
             )
 
-        project_to_delete = project_ownership_verification_result.data[0]
-
-        # Delete project - CASCADE will automatically delete all related data:
-        # project_settings, project_documents, document_chunks, chats, messages, etc.
-        project_deletion_result = (
-            supabase.table("projects")
-            .delete()
-            .eq("id", project_id)
-            .eq("clerk_id", current_user_clerk_id)
-            .execute()
-        )
-
-        if not project_deletion_result.data:
-            logger.error("delete_project_failed", project_id=project_id)
-            raise HTTPException(
-                status_code=500,  # Internal Server Error - deletion failed unexpectedly
-                detail="Failed to delete project - please try again",
-            )
-
         successfully_deleted_project = project_deletion_result.data[0]
+        _invalidate_project_list(current_user_clerk_id)
         logger.info("delete_project_success", project_id=project_id)
 
         return {
@@ -178,6 +218,8 @@ async def delete_project(
             "message": "Project deleted successfully",
             "data": {"deleted_project": successfully_deleted_project},
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
             "delete_project_exception",
@@ -187,18 +229,21 @@ async def delete_project(
         )
         raise HTTPException(
             status_code=500,
-            detail=f"An internal server error occurred while deleting project: {str(e)}",
+            detail="An internal server error occurred while deleting project",
         )
 
 
 @router.get("/{project_id}")
 async def get_project(
-    project_id: str, current_user_clerk_id: str = Depends(get_current_user_clerk_id)
+    project_id: str,
+    request: Request,
+    response: Response,
+    current_user_clerk_id: str = Depends(get_current_user_clerk_id),
 ):
     try:
-        logger.info("get_project_started", project_id=project_id)
-        project_result = (
-            supabase.table("projects")
+        logger.debug("get_project_started", project_id=project_id)
+        project_result = await asyncio.to_thread(
+            lambda: supabase.table("projects")
             .select("*")
             .eq("id", project_id)
             .eq("clerk_id", current_user_clerk_id)
@@ -212,19 +257,83 @@ async def get_project(
                 detail="Project not found or you don't have permission to access it",
             )
 
-        logger.info("get_project_success", project_id=project_id)
+        not_modified = _conditional_response(request, response, project_result.data[0])
+        if not_modified is not None:
+            return not_modified
+
+        logger.debug("get_project_success", project_id=project_id)
         return {
             "success": True,
             "message": "Project retrieved successfully",
             "data": project_result.data[0],
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
             "get_project_exception", project_id=project_id, error=str(e), exc_info=True
         )
         raise HTTPException(
             status_code=500,
-            detail=f"An internal server error occurred while retrieving project: {str(e)}",
+            detail="An internal server error occurred while retrieving project",
+        )
+
+
+@router.get("/{project_id}/full")
+async def get_project_full(
+    project_id: str, current_user_clerk_id: str = Depends(get_current_user_clerk_id)
+):
+    try:
+        logger.debug("get_project_full_started", project_id=project_id)
+        # One embedded select instead of the three calls the frontend
+        # makes on a cold project page (project + settings + chats) -
+        # PostgREST resolves the FK embeds in a single SQL statement.
+        project_full_result = await asyncio.to_thread(
+            lambda: supabase.table("projects")
+            .select("*, project_settings(*), chats(*)")
+            .eq("id", project_id)
+            .eq("clerk_id", current_user_clerk_id)
+            .order("created_at", desc=True, foreign_table="chats")
+            .execute()
+        )
+
+        if not project_full_result.data:
+            logger.warning(
+                "get_project_full_not_found_or_forbidden", project_id=project_id
+            )
+            raise HTTPException(
+                status_code=404,
+                detail="Project not found or you don't have permission to access it",
+            )
+
+        project_row = project_full_result.data[0]
+        project_settings = project_row.pop("project_settings", [])
+        project_chats = project_row.pop("chats", [])
+
+        logger.debug("get_project_full_success", project_id=project_id)
+        # Shaped to match the three standalone endpoints so the client
+        # can migrate incrementally
+        return {
+            "success": True,
+            "message": "Project retrieved successfully",
+            "data": {
+                "project": project_row,
+                "settings": project_settings[0] if project_settings else None,
+                "chats": project_chats,
+            },
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(
+            "get_project_full_exception",
+            project_id=project_id,
+            error=str(e),
+            exc_info=True,
+        )
+        raise HTTPException(
+            status_code=500,
+            detail="An internal server error occurred while retrieving project",
         )
 
 
@@ -233,9 +342,9 @@ async def get_project_chats(
     project_id: str, current_user_clerk_id: str = Depends(get_current_user_clerk_id)
 ):
     try:
-        logger.info("get_project_chats_started", project_id=project_id)
-        project_chats_result = (
-            supabase.table("chats")
+        logger.debug("get_project_chats_started", project_id=project_id)
+        project_chats_result = await asyncio.to_thread(
+            lambda: supabase.table("chats")
             .select("*")
             .eq("project_id", project_id)
             .eq("clerk_id", current_user_clerk_id)
@@ -249,7 +358,7 @@ async def get_project_chats(
         #         detail="No chats found for project",
         #     )
 
-        logger.info(
+        logger.debug(
             "get_project_chats_success",
             project_id=project_id,
             count=len(project_chats_result.data),
@@ -259,6 +368,8 @@ async def get_project_chats(
             "message": "Project chats retrieved successfully",
             "data": project_chats_result.data,  # Not result.data[0] because we are returning all chats for the project
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
             "get_project_chats_exception",
@@ -268,18 +379,21 @@ async def get_project_chats(
         )
         raise HTTPException(
             status_code=500,
-            detail=f"An internal server error occurred while retrieving project {project_id} chats: {str(e)}",
+            detail=f"An internal server error occurred while retrieving project {project_id} chats",
         )
 
 
 @router.get("/{project_id}/settings")
 async def get_project_settings(
-    project_id: str, current_user_clerk_id: str = Depends(get_current_user_clerk_id)
+    project_id: str,
+    request: Request,
+    response: Response,
+    current_user_clerk_id: str = Depends(get_current_user_clerk_id),
 ):
     try:
-        logger.info("get_project_settings_started", project_id=project_id)
-        project_settings_result = (
-            supabase.table("project_settings")
+        logger.debug("get_project_settings_started", project_id=project_id)
+        project_settings_result = await asyncio.to_thread(
+            lambda: supabase.table("project_settings")
             .select("*")
             .eq("project_id", project_id)
             .execute()
@@ -292,12 +406,20 @@ async def get_project_settings(
                 detail="No settings found for project",
             )
 
-        logger.info("get_project_settings_success", project_id=project_id)
+        not_modified = _conditional_response(
+            request, response, project_settings_result.data[0]
+        )
+        if not_modified is not None:
+            return not_modified
+
+        logger.debug("get_project_settings_success", project_id=project_id)
         return {
             "success": True,
             "message": "Project settings retrieved successfully",
             "data": project_settings_result.data[0],
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
             "get_project_settings_exception",
@@ -307,7 +429,7 @@ async def get_project_settings(
         )
         raise HTTPException(
             status_code=500,
-            detail=f"An internal server error occurred while retrieving project {project_id} settings: {str(e)}",
+            detail=f"An internal server error occurred while retrieving project {project_id} settings",
         )
 
 
@@ -318,53 +440,33 @@ async def update_project_settings(
     current_user_clerk_id: str = Depends(get_current_user_clerk_id),
 ):
     try:
-        logger.info("update_project_settings_started", project_id=project_id)
-        # Verify if the project settings exist and belongs to the current user
-        # First verify the project belongs to the user
-        project_ownership_verification_result = (
-            supabase.table("projects")
-            .select("id")
-            .eq("id", project_id)
-            .eq("clerk_id", current_user_clerk_id)
-            .execute()
+        logger.debug("update_project_settings_started", project_id=project_id)
+        # Ownership check and update in ONE statement: project_settings
+        # has no clerk_id column, so the RPC joins projects inside the
+        # UPDATE itself. An empty result covers all three old pre-check
+        # failures - missing project, wrong owner, or missing settings row.
+        project_settings_update_result = await asyncio.to_thread(
+            lambda: supabase.rpc(
+                "update_project_settings_owned",
+                {
+                    "p_project_id": project_id,
+                    "p_clerk_id": current_user_clerk_id,
+                    # mode="json" gives JSON-native values for the jsonb
+                    # argument, so postgrest doesn't re-coerce anything
+                    "p_settings": settings.model_dump(mode="json"),
+                },
+            ).execute()
         )
 
-        if not project_ownership_verification_result.data:
+        if not project_settings_update_result.data:
             logger.warning("update_project_settings_forbidden", project_id=project_id)
             raise HTTPException(
                 status_code=404,
-                detail="Project not found or you don't have permission to update its settings",
+                detail="Project settings not found or you don't have permission to update them",
             )
 
-        # Then verify the project settings exist
-        project_settings_ownership_verification_result = (
-            supabase.table("project_settings")
-            .select("id")
-            .eq("project_id", project_id)
-            .execute()
-        )
-
-        if not project_settings_ownership_verification_result.data:
-            raise HTTPException(
-                status_code=404,
-                detail="Project settings not found for this project",
-            )
-
-        project_settings_update_data = (
-            settings.model_dump()  # Pydantic modal to dictionary conversion
-        )
-        project_settings_update_result = (
-            supabase.table("project_settings")
-            .update(project_settings_update_data)
-            .eq("project_id", project_id)
-            .execute()
-        )
-
-        if not project_settings_update_result.data:
-            logger.error("update_project_settings_failed", project_id=project_id)
-            raise HTTPException(
-                status_code=422, detail="Failed to update project settings"
-            )
+        # Drop the cached settings so retrieval picks up the new values
+        invalidate_project_cache(project_id)
 
         logger.info("update_project_settings_success", project_id=project_id)
         return {
@@ -372,6 +474,8 @@ async def update_project_settings(
             "message": "Project settings updated successfully",
             "data": project_settings_update_result.data[0],
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
             "update_project_settings_exception",
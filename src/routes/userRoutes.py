@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
 from src.services.supabase import supabase
 from src.config.logging import get_logger
@@ -39,33 +40,35 @@ async def create_user(clerk_webhook_data: dict):
                 status_code=400, detail="Missing or invalid clerk_id in user data"
             )
 
-        # Check if user already exists to prevent duplicates
-        existing_user = (
-            supabase.table("users")
-            .select("clerk_id")
-            .eq("clerk_id", clerk_id)
+        # One idempotent UPSERT instead of SELECT-then-INSERT - Clerk
+        # retries webhooks, and the old pair had a duplicate-key race
+        # between the check and the insert. users.clerk_id is UNIQUE, and
+        # with ignore_duplicates the conflict case returns no rows, which
+        # doubles as the "already exists" signal.
+        # The supabase client is sync - run it off the event loop (same
+        # pattern as the other routes)
+        result = await asyncio.to_thread(
+            lambda: supabase.table("users")
+            .upsert(
+                {"clerk_id": clerk_id},
+                on_conflict="clerk_id",
+                ignore_duplicates=True,
+            )
             .execute()
         )
-        if existing_user.data:
-            logger.info("create_user_already_exists", clerk_id=clerk_id)
-            return {"message": "User already exists", "clerk_id": clerk_id}
-
-        # Create new user in database
-        result = supabase.table("users").insert({"clerk_id": clerk_id}).execute()
 
-        # Verify insertion was successful
         if not result.data:
-            logger.error("create_user_db_failed", clerk_id=clerk_id)
-            raise HTTPException(
-                status_code=500, detail="Failed to create user in database"
-            )
+            logger.info("create_user_already_exists", clerk_id=clerk_id)
+            return {"message": "User already exists", "clerk_id": clerk_id}
 
         logger.info("create_user_success", clerk_id=clerk_id)
         return {"message": "User created successfully", "user": result.data[0]}
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("create_user_exception", error=str(e), exc_info=True)
         raise HTTPException(
             status_code=500,
-            detail=f"Internal server error occurred while processing webhook {str(e)}",
+            detail="Internal server error occurred while processing webhook",
         )
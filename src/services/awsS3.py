@@ -1,12 +1,20 @@
 import boto3
+from botocore.config import Config
 from src.config.index import appConfig
 from src.config.logging import get_logger
 
 logger = get_logger(__name__)
 
+# One client for the process: botocore's endpoint resolution and signer
+# construction happen once at import, not per request, and the connection
+# pool is sized for concurrent uploads/deletes instead of the default 10.
 s3_client = boto3.client(
     "s3",
     aws_access_key_id=appConfig["aws_access_key_id"],
     aws_secret_access_key=appConfig["aws_secret_access_key"],
     region_name=appConfig["aws_region"],
+    config=Config(
+        max_pool_connections=50,
+        retries={"max_attempts": 3, "mode": "standard"},
+    ),
 )
@@ -18,17 +18,21 @@ celery_app = Celery(
 )
 
 
-@celery_app.task
+# ignore_result: dispatch is fire-and-forget (callers only read .id) and
+# there is no result backend - progress is tracked via the document's
+# processing_status column, so skip result bookkeeping entirely.
+@celery_app.task(ignore_result=True)
 def perform_rag_ingestion_task(document_id: str):
     try:
         logger.info("celery_task_started", document_id=document_id)
         process_document_result = process_document(document_id)
         logger.info("celery_task_completed", document_id=document_id)
-        return (
-            f"Document {process_document_result['document_id']} processed successfully"
-        )
+        return {
+            "document_id": process_document_result["document_id"],
+            "status": "ok",
+        }
     except Exception as e:
         logger.error(
             "celery_task_failed", document_id=document_id, error=str(e), exc_info=True
         )
-        return f"Failed to process document {document_id}: {str(e)}"
+        return {"document_id": document_id, "status": "failed", "error": str(e)}
@@ -1,3 +1,7 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from src.config.index import appConfig
 from fastapi import Request, HTTPException
 
@@ -6,15 +10,42 @@ from clerk_backend_api import Clerk
 from clerk_backend_api.security import authenticate_request
 from clerk_backend_api.security.types import AuthenticateRequestOptions
 
+# One SDK instance for the process - constructing Clerk(...) per request
+# rebuilt its httpx client (and TLS pool) on every authenticated call.
+# The SDK wraps httpx and is safe to share across requests.
+_clerk_sdk = Clerk(appConfig["clerk_secret_key"])
+_auth_options = AuthenticateRequestOptions(authorized_parties=appConfig["domain"])
+
+# Short-lived verification cache: the same client fires many requests per
+# minute with the same bearer token, and each one otherwise pays signature
+# verification. Keys are SHA-256 digests (raw tokens are never stored) and
+# entries expire at min(now + TTL, token exp), so a token is never trusted
+# past its own expiry. LRU-bounded like the embedding cache.
+_AUTH_CACHE_TTL_SECONDS = 60
+_AUTH_CACHE_MAX_ENTRIES = 10_000
+_auth_cache: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+# This dependency is sync, so FastAPI runs it in a threadpool - the cache
+# needs the same locking as the embedding cache.
+_auth_cache_lock = threading.Lock()
+
 
 def get_current_user_clerk_id(request: Request):
     try:
-        sdk = Clerk(appConfig["clerk_secret_key"])
+        auth_header = request.headers.get("authorization")
+        cache_key = None
+        if auth_header:
+            cache_key = hashlib.sha256(auth_header.encode()).hexdigest()
+            with _auth_cache_lock:
+                cached_entry = _auth_cache.get(cache_key)
+                if cached_entry is not None:
+                    clerk_id, expires_at = cached_entry
+                    if time.time() < expires_at:
+                        _auth_cache.move_to_end(cache_key)
+                        return clerk_id
+                    _auth_cache.pop(cache_key, None)
+
         # request_state = Token
-        request_state = sdk.authenticate_request(
-            request,
-            options=AuthenticateRequestOptions(authorized_parties=appConfig["domain"]),
-        )
+        request_state = _clerk_sdk.authenticate_request(request, options=_auth_options)
 
         if not request_state.is_signed_in:
             raise HTTPException(status_code=401, detail="User is not signed in")
@@ -24,8 +55,21 @@ def get_current_user_clerk_id(request: Request):
         if not clerk_id:
             raise HTTPException(status_code=401, detail="Clerk ID not found in token")
 
+        if cache_key:
+            expires_at = time.time() + _AUTH_CACHE_TTL_SECONDS
+            token_exp = request_state.payload.get("exp")
+            if token_exp:
+                expires_at = min(expires_at, float(token_exp))
+            with _auth_cache_lock:
+                _auth_cache[cache_key] = (clerk_id, expires_at)
+                _auth_cache.move_to_end(cache_key)
+                while len(_auth_cache) > _AUTH_CACHE_MAX_ENTRIES:
+                    _auth_cache.popitem(last=False)
+
         return clerk_id
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
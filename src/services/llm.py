@@ -1,20 +1,44 @@
+import httpx
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from src.config.index import appConfig
 
+# One persistent HTTP/2 connection pool shared by every OpenAI-backed client.
+# Keep-alive + HTTP/2 multiplexing avoids a fresh TCP+TLS handshake
+# (~50-150ms) per request, which compounds under concurrent multi-query
+# retrieval. Separate sync/async clients because both code paths exist
+# (blocking retrieval helpers and agent astream_events).
+_http_limits = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+shared_http_client = httpx.Client(http2=True, limits=_http_limits)
+shared_async_http_client = httpx.AsyncClient(http2=True, limits=_http_limits)
+
 openAI = {
     "embeddings_llm": ChatOpenAI(
-        model="gpt-4-turbo", api_key=appConfig["openai_api_key"], temperature=0
+        model="gpt-4-turbo",
+        api_key=appConfig["openai_api_key"],
+        temperature=0,
+        http_client=shared_http_client,
+        http_async_client=shared_async_http_client,
     ),
     "embeddings": OpenAIEmbeddings(
         model="text-embedding-3-large",
         api_key=appConfig["openai_api_key"],
         dimensions=1536,  # ! Do not changes this value. It is used in the document_chunks embedding vector.
+        http_client=shared_http_client,
+        http_async_client=shared_async_http_client,
     ),
     "chat_llm": ChatOpenAI(
-        model="gpt-4o", api_key=appConfig["openai_api_key"], temperature=0
+        model="gpt-4o",
+        api_key=appConfig["openai_api_key"],
+        temperature=0,
+        http_client=shared_http_client,
+        http_async_client=shared_async_http_client,
     ),
     "mini_llm": ChatOpenAI(
-        model="gpt-4o-mini", api_key=appConfig["openai_api_key"], temperature=0
+        model="gpt-4o-mini",
+        api_key=appConfig["openai_api_key"],
+        temperature=0,
+        http_client=shared_http_client,
+        http_async_client=shared_async_http_client,
     ),
     "simple_agent_chat_llm": "gpt-4o",
 }
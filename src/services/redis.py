@@ -0,0 +1,10 @@
+import redis
+from src.config.index import appConfig
+
+# Reuses the same Redis instance that already backs the Celery broker.
+# None when REDIS_URL isn't configured - callers treat that as "no cache".
+redis_client = (
+    redis.Redis.from_url(appConfig["redis_url"], decode_responses=True)
+    if appConfig.get("redis_url")
+    else None
+)
@@ -1,16 +1,23 @@
-from urllib.parse import urlparse
+import re
+
+# Compiled once at import - validate_url runs on every process-url request
+# and a precompiled pattern avoids both urlparse's per-call object
+# construction and Python-level backtracking (the pattern is anchored and
+# each part is a disjoint character class).
+_URL_RE = re.compile(
+    r"^https?://"  # scheme (process_url normalizes to http/https first)
+    r"[^\s/:?#]+"  # host
+    r"(?::\d+)?"  # optional port
+    r"(?:[/?#]\S*)?$",  # optional path / query / fragment
+    re.IGNORECASE,
+)
 
 
 def validate_url(url_string: str) -> bool:
     if not isinstance(url_string, str) or not url_string.strip():
         return False
 
-    try:
-        parsed_url = urlparse(url_string)
-        return bool(parsed_url.scheme) and bool(parsed_url.netloc)
-    except Exception:
-        # Catch any parsing errors for malformed URLs
-        return False
+    return _URL_RE.match(url_string) is not None
 
 
 #
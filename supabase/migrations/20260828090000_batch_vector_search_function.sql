@@ -0,0 +1,74 @@
+----------------------------------------------------------
+--- vector_search_document_chunks_batch function ---
+-- Batched variant of vector_search_document_chunks: accepts N query
+-- embeddings and runs the per-embedding top-k search inside ONE
+-- round-trip instead of N separate RPC calls.
+--
+-- Behavior / steps:
+-- 1. Unnest the `query_embeddings` array WITH ORDINALITY so each
+--    embedding keeps its position (returned as zero-based `query_index`).
+-- 2. For each embedding, run the same filter + similarity threshold +
+--    ORDER BY distance + LIMIT as the single-query function via a
+--    LATERAL join.
+-- 3. Return all rows tagged with their `query_index` so the client can
+--    group them back into per-query result sets before RRF fusion.
+----------------------------------------------------------
+CREATE OR REPLACE FUNCTION vector_search_document_chunks_batch(
+    query_embeddings vector[],
+    filter_document_ids uuid[],
+    match_threshold double precision DEFAULT 0.3,
+    chunks_per_search integer DEFAULT 20
+)
+RETURNS TABLE(
+    query_index integer,
+    id uuid,
+    document_id uuid,
+    content text,
+    chunk_index integer,
+    created_at timestamp with time zone,
+    page_number integer,
+    char_count integer,
+    type jsonb,
+    original_content jsonb,
+    embedding vector
+)
+LANGUAGE sql
+AS $function$
+SELECT
+    (q.ordinality - 1)::integer AS query_index,
+    matches.id,
+    matches.document_id,
+    matches.content,
+    matches.chunk_index,
+    matches.created_at,
+    matches.page_number,
+    matches.char_count,
+    matches.type,
+    matches.original_content,
+    matches.embedding
+FROM
+    unnest(query_embeddings) WITH ORDINALITY AS q(query_embedding, ordinality)
+    CROSS JOIN LATERAL (
+        SELECT
+            dc.id,
+            dc.document_id,
+            dc.content,
+            dc.chunk_index,
+            dc.created_at,
+            dc.page_number,
+            dc.char_count,
+            dc.type,
+            dc.original_content,
+            dc.embedding
+        FROM
+            document_chunks dc
+        WHERE
+            dc.document_id = ANY(filter_document_ids)
+            AND dc.embedding IS NOT NULL
+            AND (1 - (dc.embedding <=> q.query_embedding)) > match_threshold
+        ORDER BY
+            dc.embedding <=> q.query_embedding ASC
+        LIMIT
+            chunks_per_search
+    ) AS matches;
+$function$;
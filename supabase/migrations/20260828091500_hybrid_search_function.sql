@@ -0,0 +1,102 @@
+----------------------------------------------------------
+--- hybrid_search_document_chunks function ---
+-- Server-side hybrid search: runs the vector search and the keyword
+-- search in one statement and fuses them with weighted RRF
+-- (Reciprocal Rank Fusion) inside Postgres, so the client gets the
+-- already-fused top-k rows in a single round-trip instead of two RPC
+-- calls plus client-side fusion.
+--
+-- Behavior / steps:
+-- 1. vector_hits CTE: same filter + similarity threshold + distance
+--    ordering as vector_search_document_chunks, with ROW_NUMBER as rank.
+-- 2. keyword_hits CTE: same websearch_to_tsquery + ts_rank_cd ordering
+--    as keyword_search_document_chunks, with ROW_NUMBER as rank.
+-- 3. FULL OUTER JOIN the two hit lists on chunk id and compute
+--    sum(weight / (rrf_k + rank)) per chunk.
+-- 4. Sort by fused score descending and return the top chunks_per_search.
+----------------------------------------------------------
+CREATE OR REPLACE FUNCTION hybrid_search_document_chunks(
+    query_text text,
+    query_embedding vector,
+    filter_document_ids uuid[],
+    match_threshold double precision DEFAULT 0.3,
+    chunks_per_search integer DEFAULT 20,
+    vector_weight double precision DEFAULT 0.7,
+    keyword_weight double precision DEFAULT 0.3,
+    rrf_k integer DEFAULT 60
+)
+RETURNS TABLE(
+    id uuid,
+    document_id uuid,
+    content text,
+    chunk_index integer,
+    created_at timestamp with time zone,
+    page_number integer,
+    char_count integer,
+    type jsonb,
+    original_content jsonb,
+    embedding vector,
+    rrf_score double precision
+)
+LANGUAGE sql
+AS $function$
+WITH vector_hits AS (
+    SELECT
+        dc.id,
+        ROW_NUMBER() OVER (ORDER BY dc.embedding <=> query_embedding ASC) AS rank
+    FROM
+        document_chunks dc
+    WHERE
+        dc.document_id = ANY(filter_document_ids)
+        AND dc.embedding IS NOT NULL
+        AND (1 - (dc.embedding <=> query_embedding)) > match_threshold
+    ORDER BY
+        dc.embedding <=> query_embedding ASC
+    LIMIT
+        chunks_per_search
+),
+keyword_hits AS (
+    SELECT
+        dc.id,
+        ROW_NUMBER() OVER (
+            ORDER BY ts_rank_cd(dc.fts, websearch_to_tsquery('english', query_text)) DESC
+        ) AS rank
+    FROM
+        document_chunks dc
+    WHERE
+        dc.document_id = ANY(filter_document_ids)
+        AND dc.fts @@ websearch_to_tsquery('english', query_text)
+    ORDER BY
+        ts_rank_cd(dc.fts, websearch_to_tsquery('english', query_text)) DESC
+    LIMIT
+        chunks_per_search
+),
+fused AS (
+    SELECT
+        COALESCE(v.id, k.id) AS id,
+        COALESCE(vector_weight / (rrf_k + v.rank), 0)
+            + COALESCE(keyword_weight / (rrf_k + k.rank), 0) AS rrf_score
+    FROM
+        vector_hits v
+        FULL OUTER JOIN keyword_hits k ON v.id = k.id
+)
+SELECT
+    dc.id,
+    dc.document_id,
+    dc.content,
+    dc.chunk_index,
+    dc.created_at,
+    dc.page_number,
+    dc.char_count,
+    dc.type,
+    dc.original_content,
+    dc.embedding,
+    fused.rrf_score
+FROM
+    fused
+    JOIN document_chunks dc ON dc.id = fused.id
+ORDER BY
+    fused.rrf_score DESC
+LIMIT
+    chunks_per_search;
+$function$;
@@ -0,0 +1,28 @@
+----------------------------------------------------------
+--- update_document_status function ---
+-- Atomic status update for ingestion bookkeeping: sets the new
+-- processing_status and merges the new details into the existing
+-- processing_details JSON in ONE statement, replacing the previous
+-- select-then-update pair (two round-trips and a read-modify-write
+-- race window) in the worker.
+----------------------------------------------------------
+CREATE OR REPLACE FUNCTION update_document_status(
+    doc_id uuid,
+    new_status text,
+    new_details jsonb DEFAULT '{}'::jsonb
+)
+RETURNS TABLE(id uuid)
+LANGUAGE sql
+AS $function$
+UPDATE project_documents
+SET
+    processing_status = new_status,
+    processing_details = (
+        COALESCE(processing_details::jsonb, '{}'::jsonb)
+        || COALESCE(new_details, '{}'::jsonb)
+    )::json
+WHERE
+    project_documents.id = doc_id
+RETURNING
+    project_documents.id;
+$function$;
@@ -0,0 +1,104 @@
+----------------------------------------------------------
+--- multi_hybrid_search_document_chunks function ---
+-- Multi-query hybrid search fused entirely server-side: takes the N
+-- query variations (texts + embeddings), runs the per-query hybrid
+-- search via hybrid_search_document_chunks in a LATERAL join, then
+-- RRF-fuses ACROSS the queries and returns only the final top-k rows.
+-- Replaces N hybrid RPC round-trips plus client-side fusion with one
+-- round-trip and one result set.
+--
+-- Behavior / steps:
+-- 1. Pair up query_texts / query_embeddings by ordinality.
+-- 2. For each pair, call hybrid_search_document_chunks (which already
+--    fuses vector+keyword with the configured weights) and rank its
+--    rows with ROW_NUMBER.
+-- 3. Fuse across queries with sum(1 / (rrf_k + rank)) / N per chunk -
+--    the same equal-weight RRF the client previously applied.
+-- 4. Return the top chunks_per_search rows by fused score.
+----------------------------------------------------------
+CREATE OR REPLACE FUNCTION multi_hybrid_search_document_chunks(
+    query_texts text[],
+    query_embeddings vector[],
+    filter_document_ids uuid[],
+    match_threshold double precision DEFAULT 0.3,
+    chunks_per_search integer DEFAULT 20,
+    vector_weight double precision DEFAULT 0.7,
+    keyword_weight double precision DEFAULT 0.3,
+    rrf_k integer DEFAULT 60
+)
+RETURNS TABLE(
+    id uuid,
+    document_id uuid,
+    content text,
+    chunk_index integer,
+    created_at timestamp with time zone,
+    page_number integer,
+    char_count integer,
+    type jsonb,
+    original_content jsonb,
+    embedding vector,
+    rrf_score double precision
+)
+LANGUAGE sql
+AS $function$
+WITH queries AS (
+    SELECT
+        t.query_text,
+        e.query_embedding,
+        t.ordinality
+    FROM
+        unnest(query_texts) WITH ORDINALITY AS t(query_text, ordinality)
+        JOIN unnest(query_embeddings) WITH ORDINALITY AS e(query_embedding, ordinality)
+            USING (ordinality)
+),
+per_query AS (
+    SELECT
+        q.ordinality AS query_ordinality,
+        h.id,
+        ROW_NUMBER() OVER (
+            PARTITION BY q.ordinality
+            ORDER BY h.rrf_score DESC
+        ) AS rank
+    FROM
+        queries q
+        CROSS JOIN LATERAL hybrid_search_document_chunks(
+            q.query_text,
+            q.query_embedding,
+            filter_document_ids,
+            match_threshold,
+            chunks_per_search,
+            vector_weight,
+            keyword_weight,
+            rrf_k
+        ) h
+),
+fused AS (
+    SELECT
+        per_query.id,
+        SUM(1.0 / (rrf_k + per_query.rank))
+            / GREATEST(array_length(query_texts, 1), 1) AS rrf_score
+    FROM
+        per_query
+    GROUP BY
+        per_query.id
+)
+SELECT
+    dc.id,
+    dc.document_id,
+    dc.content,
+    dc.chunk_index,
+    dc.created_at,
+    dc.page_number,
+    dc.char_count,
+    dc.type,
+    dc.original_content,
+    dc.embedding,
+    fused.rrf_score
+FROM
+    fused
+    JOIN document_chunks dc ON dc.id = fused.id
+ORDER BY
+    fused.rrf_score DESC
+LIMIT
+    chunks_per_search;
+$function$;
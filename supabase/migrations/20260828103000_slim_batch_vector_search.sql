@@ -0,0 +1,50 @@
+----------------------------------------------------------
+--- vector_search_document_chunks_batch function (slimmed) ---
+-- The batched vector search previously shipped full chunk rows - large
+-- content text and original_content payloads - for every candidate of
+-- every query variation, even though the client-side RRF fusion only
+-- needs (id, similarity) until the final top-k is chosen. Return just
+-- the ranking columns; the client hydrates the few surviving chunks
+-- with one follow-up SELECT ... WHERE id = ANY(...).
+--
+-- DROP + CREATE because the return type changes.
+----------------------------------------------------------
+DROP FUNCTION IF EXISTS vector_search_document_chunks_batch(
+    vector[], uuid[], double precision, integer
+);
+
+CREATE FUNCTION vector_search_document_chunks_batch(
+    query_embeddings vector[],
+    filter_document_ids uuid[],
+    match_threshold double precision DEFAULT 0.3,
+    chunks_per_search integer DEFAULT 20
+)
+RETURNS TABLE(
+    query_index integer,
+    id uuid,
+    similarity double precision
+)
+LANGUAGE sql
+AS $function$
+SELECT
+    (q.ordinality - 1)::integer AS query_index,
+    matches.id,
+    matches.similarity
+FROM
+    unnest(query_embeddings) WITH ORDINALITY AS q(query_embedding, ordinality)
+    CROSS JOIN LATERAL (
+        SELECT
+            dc.id,
+            1 - (dc.embedding <=> q.query_embedding) AS similarity
+        FROM
+            document_chunks dc
+        WHERE
+            dc.document_id = ANY(filter_document_ids)
+            AND dc.embedding IS NOT NULL
+            AND (1 - (dc.embedding <=> q.query_embedding)) > match_threshold
+        ORDER BY
+            dc.embedding <=> q.query_embedding ASC
+        LIMIT
+            chunks_per_search
+    ) AS matches;
+$function$;
@@ -0,0 +1,10 @@
+----------------------------------------------------------
+--- messages (chat_id, created_at DESC) index ---
+-- Every chat load and every history read filters messages by chat_id and
+-- orders by created_at; without an index that's a sequential scan that
+-- grows with total message volume. This composite index backs the
+-- newest-first, LIMIT-bounded reads used by get_chat and
+-- get_chat_history.
+----------------------------------------------------------
+CREATE INDEX IF NOT EXISTS messages_chat_id_created_at_idx
+    ON messages (chat_id, created_at DESC);
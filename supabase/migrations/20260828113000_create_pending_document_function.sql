@@ -0,0 +1,41 @@
+----------------------------------------------------------
+--- create_pending_document function ---
+-- The presigned-url route previously issued two round-trips: a SELECT on
+-- projects to verify ownership, then an INSERT into project_documents.
+-- This function performs the check and the insert atomically in one RPC:
+-- an empty result set means the project doesn't exist or isn't owned by
+-- the caller (the route maps that to 404), which also closes the
+-- check-then-insert race window.
+----------------------------------------------------------
+CREATE OR REPLACE FUNCTION create_pending_document(
+    p_project_id uuid,
+    p_clerk_id text,
+    p_filename text,
+    p_s3_key text,
+    p_file_size integer,
+    p_file_type text,
+    p_processing_status text DEFAULT 'pending'
+)
+RETURNS SETOF project_documents
+LANGUAGE plpgsql
+AS $function$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM projects
+        WHERE id = p_project_id
+          AND clerk_id = p_clerk_id
+    ) THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    INSERT INTO project_documents
+        (project_id, filename, s3_key, file_size, file_type,
+         processing_status, clerk_id)
+    VALUES
+        (p_project_id, p_filename, p_s3_key, p_file_size, p_file_type,
+         p_processing_status, p_clerk_id)
+    RETURNING *;
+END;
+$function$;
@@ -0,0 +1,43 @@
+----------------------------------------------------------
+--- create_project_with_defaults function ---
+-- Creating a project previously took two round-trips from the API
+-- (INSERT projects, then INSERT project_settings) plus a compensating
+-- DELETE when the second insert failed. This function performs both
+-- inserts inside one transaction - if the settings insert fails the
+-- project insert rolls back automatically - and returns the created
+-- rows as a {project, settings} JSON payload.
+----------------------------------------------------------
+CREATE OR REPLACE FUNCTION create_project_with_defaults(
+    p_name text,
+    p_description text,
+    p_clerk_id text
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $function$
+DECLARE
+    v_project projects;
+    v_settings project_settings;
+BEGIN
+    INSERT INTO projects (name, description, clerk_id)
+    VALUES (p_name, p_description, p_clerk_id)
+    RETURNING * INTO v_project;
+
+    INSERT INTO project_settings
+        (project_id, embedding_model, rag_strategy, agent_type,
+         chunks_per_search, final_context_size, similarity_threshold,
+         number_of_queries, reranking_enabled, reranking_model,
+         vector_weight, keyword_weight)
+    VALUES
+        (v_project.id, 'text-embedding-3-large', 'basic', 'agentic',
+         10, 5, 0.3,
+         5, true, 'reranker-english-v3.0',
+         0.7, 0.3)
+    RETURNING * INTO v_settings;
+
+    RETURN jsonb_build_object(
+        'project', to_jsonb(v_project),
+        'settings', to_jsonb(v_settings)
+    );
+END;
+$function$;
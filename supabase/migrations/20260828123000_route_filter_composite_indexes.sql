@@ -0,0 +1,20 @@
+----------------------------------------------------------
+--- Composite indexes for the route filter tuples ---
+-- Every file/chat/project route filters by the ownership tuple
+-- (project_id, clerk_id), and the list endpoints additionally order by
+-- created_at DESC. These indexes let each of those queries resolve as a
+-- single index range scan instead of a seq scan or bitmap AND, and the
+-- DESC column serves the ORDER BY without a sort step. s3_key backs the
+-- confirm-upload / delete lookups.
+----------------------------------------------------------
+CREATE INDEX IF NOT EXISTS project_documents_pid_cid_created_idx
+    ON project_documents (project_id, clerk_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS chats_pid_cid_created_idx
+    ON chats (project_id, clerk_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS projects_clerk_id_idx
+    ON projects (clerk_id);
+
+CREATE INDEX IF NOT EXISTS project_documents_s3_key_idx
+    ON project_documents (s3_key);
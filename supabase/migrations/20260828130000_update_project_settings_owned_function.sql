@@ -0,0 +1,37 @@
+----------------------------------------------------------
+--- update_project_settings_owned function ---
+-- The settings-update route previously made three round-trips: a SELECT
+-- on projects for ownership, a SELECT on project_settings for existence,
+-- then the UPDATE. project_settings carries no clerk_id column, so the
+-- ownership filter can't be expressed on the UPDATE alone from PostgREST.
+-- This function joins projects in the UPDATE itself - an empty result set
+-- means the project doesn't exist, isn't owned by the caller, or has no
+-- settings row (the route maps that to 404).
+----------------------------------------------------------
+CREATE OR REPLACE FUNCTION update_project_settings_owned(
+    p_project_id uuid,
+    p_clerk_id text,
+    p_settings jsonb
+)
+RETURNS SETOF project_settings
+LANGUAGE sql
+AS $function$
+    UPDATE project_settings ps
+    SET
+        embedding_model = p_settings->>'embedding_model',
+        rag_strategy = p_settings->>'rag_strategy',
+        agent_type = p_settings->>'agent_type',
+        chunks_per_search = (p_settings->>'chunks_per_search')::integer,
+        final_context_size = (p_settings->>'final_context_size')::integer,
+        similarity_threshold = (p_settings->>'similarity_threshold')::double precision,
+        number_of_queries = (p_settings->>'number_of_queries')::integer,
+        reranking_enabled = (p_settings->>'reranking_enabled')::boolean,
+        reranking_model = p_settings->>'reranking_model',
+        vector_weight = (p_settings->>'vector_weight')::double precision,
+        keyword_weight = (p_settings->>'keyword_weight')::double precision
+    FROM projects p
+    WHERE ps.project_id = p_project_id
+      AND p.id = ps.project_id
+      AND p.clerk_id = p_clerk_id
+    RETURNING ps.*;
+$function$;
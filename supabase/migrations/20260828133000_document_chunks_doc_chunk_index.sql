@@ -0,0 +1,12 @@
+----------------------------------------------------------
+--- document_chunks (document_id, chunk_index) index ---
+-- The chunks endpoint and the ingestion pipeline read a document's
+-- chunks filtered by document_id and ordered by chunk_index; the only
+-- indexes on document_chunks so far are the HNSW and GIN search
+-- indexes, so that query seq-scans and sorts. The remaining indexes
+-- from this review round already exist: project_settings.project_id is
+-- UNIQUE (initial schema), and chats/projects got their composite
+-- filter indexes in the 20260828123000 migration.
+----------------------------------------------------------
+CREATE INDEX IF NOT EXISTS document_chunks_document_id_chunk_index_idx
+    ON document_chunks (document_id, chunk_index);
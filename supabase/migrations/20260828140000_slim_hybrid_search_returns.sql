@@ -0,0 +1,189 @@
+----------------------------------------------------------
+--- slim hybrid search return sets ---
+-- Both hybrid RPCs returned the raw embedding column (~6 KB per row at
+-- 1536 dims) with every chunk, but no caller reads it - the rows go
+-- straight into context building, which only needs the content and
+-- citation columns. Drop embedding from the return sets so the top-k
+-- payload shrinks by kilobytes per row.
+--
+-- DROP + CREATE because the return type changes; the multi-query
+-- function depends on the single-query one, so it is dropped first.
+----------------------------------------------------------
+DROP FUNCTION IF EXISTS multi_hybrid_search_document_chunks(
+    text[], vector[], uuid[], double precision, integer,
+    double precision, double precision, integer
+);
+
+DROP FUNCTION IF EXISTS hybrid_search_document_chunks(
+    text, vector, uuid[], double precision, integer,
+    double precision, double precision, integer
+);
+
+CREATE FUNCTION hybrid_search_document_chunks(
+    query_text text,
+    query_embedding vector,
+    filter_document_ids uuid[],
+    match_threshold double precision DEFAULT 0.3,
+    chunks_per_search integer DEFAULT 20,
+    vector_weight double precision DEFAULT 0.7,
+    keyword_weight double precision DEFAULT 0.3,
+    rrf_k integer DEFAULT 60
+)
+RETURNS TABLE(
+    id uuid,
+    document_id uuid,
+    content text,
+    chunk_index integer,
+    created_at timestamp with time zone,
+    page_number integer,
+    char_count integer,
+    type jsonb,
+    original_content jsonb,
+    rrf_score double precision
+)
+LANGUAGE sql
+AS $function$
+WITH vector_hits AS (
+    SELECT
+        dc.id,
+        ROW_NUMBER() OVER (ORDER BY dc.embedding <=> query_embedding ASC) AS rank
+    FROM
+        document_chunks dc
+    WHERE
+        dc.document_id = ANY(filter_document_ids)
+        AND dc.embedding IS NOT NULL
+        AND (1 - (dc.embedding <=> query_embedding)) > match_threshold
+    ORDER BY
+        dc.embedding <=> query_embedding ASC
+    LIMIT
+        chunks_per_search
+),
+keyword_hits AS (
+    SELECT
+        dc.id,
+        ROW_NUMBER() OVER (
+            ORDER BY ts_rank_cd(dc.fts, websearch_to_tsquery('english', query_text)) DESC
+        ) AS rank
+    FROM
+        document_chunks dc
+    WHERE
+        dc.document_id = ANY(filter_document_ids)
+        AND dc.fts @@ websearch_to_tsquery('english', query_text)
+    ORDER BY
+        ts_rank_cd(dc.fts, websearch_to_tsquery('english', query_text)) DESC
+    LIMIT
+        chunks_per_search
+),
+fused AS (
+    SELECT
+        COALESCE(v.id, k.id) AS id,
+        COALESCE(vector_weight / (rrf_k + v.rank), 0)
+            + COALESCE(keyword_weight / (rrf_k + k.rank), 0) AS rrf_score
+    FROM
+        vector_hits v
+        FULL OUTER JOIN keyword_hits k ON v.id = k.id
+)
+SELECT
+    dc.id,
+    dc.document_id,
+    dc.content,
+    dc.chunk_index,
+    dc.created_at,
+    dc.page_number,
+    dc.char_count,
+    dc.type,
+    dc.original_content,
+    fused.rrf_score
+FROM
+    fused
+    JOIN document_chunks dc ON dc.id = fused.id
+ORDER BY
+    fused.rrf_score DESC
+LIMIT
+    chunks_per_search;
+$function$;
+
+CREATE FUNCTION multi_hybrid_search_document_chunks(
+    query_texts text[],
+    query_embeddings vector[],
+    filter_document_ids uuid[],
+    match_threshold double precision DEFAULT 0.3,
+    chunks_per_search integer DEFAULT 20,
+    vector_weight double precision DEFAULT 0.7,
+    keyword_weight double precision DEFAULT 0.3,
+    rrf_k integer DEFAULT 60
+)
+RETURNS TABLE(
+    id uuid,
+    document_id uuid,
+    content text,
+    chunk_index integer,
+    created_at timestamp with time zone,
+    page_number integer,
+    char_count integer,
+    type jsonb,
+    original_content jsonb,
+    rrf_score double precision
+)
+LANGUAGE sql
+AS $function$
+WITH queries AS (
+    SELECT
+        t.query_text,
+        e.query_embedding,
+        t.ordinality
+    FROM
+        unnest(query_texts) WITH ORDINALITY AS t(query_text, ordinality)
+        JOIN unnest(query_embeddings) WITH ORDINALITY AS e(query_embedding, ordinality)
+            USING (ordinality)
+),
+per_query AS (
+    SELECT
+        q.ordinality AS query_ordinality,
+        h.id,
+        ROW_NUMBER() OVER (
+            PARTITION BY q.ordinality
+            ORDER BY h.rrf_score DESC
+        ) AS rank
+    FROM
+        queries q
+        CROSS JOIN LATERAL hybrid_search_document_chunks(
+            q.query_text,
+            q.query_embedding,
+            filter_document_ids,
+            match_threshold,
+            chunks_per_search,
+            vector_weight,
+            keyword_weight,
+            rrf_k
+        ) h
+),
+fused AS (
+    SELECT
+        per_query.id,
+        SUM(1.0 / (rrf_k + per_query.rank))
+            / GREATEST(array_length(query_texts, 1), 1) AS rrf_score
+    FROM
+        per_query
+    GROUP BY
+        per_query.id
+)
+SELECT
+    dc.id,
+    dc.document_id,
+    dc.content,
+    dc.chunk_index,
+    dc.created_at,
+    dc.page_number,
+    dc.char_count,
+    dc.type,
+    dc.original_content,
+    fused.rrf_score
+FROM
+    fused
+    JOIN document_chunks dc ON dc.id = fused.id
+ORDER BY
+    fused.rrf_score DESC
+LIMIT
+    chunks_per_search;
+$function$;